@@ -20,6 +20,7 @@ const http_1 = __importDefault(require("http"));
 const socket_io_1 = require("socket.io");
 const llm_1 = require("./llm");
 const db_1 = require("./db");
+const wireFormat_1 = require("./wireFormat");
 dotenv_1.default.config();
 const app = (0, express_1.default)();
 // Middleware
@@ -47,33 +48,108 @@ const io = new socket_io_1.Server(server, {
 // Configure namespaces
 const messagingNamespace = io.of('/messaging');
 const frontendNamespace = io.of('/frontend');
-// Update the message queue initialization
-let messageQueue = [];
+// Queued messages per tenant, so one tenant's chat change or reply never touches another's
+const messageQueues = new Map();
+// Database user for sockets that connect without a user id (single-tenant setups)
+const DEFAULT_USER_ID = "pearl@easyspeak-aac.com";
+// Both sides of a tenant join the room named after its user id, sent in the handshake auth
+function joinTenantRoom(socket) {
+    var _a;
+    const userId = (_a = socket.handshake.auth) === null || _a === void 0 ? void 0 : _a.user_id;
+    if (typeof userId !== 'string' || !userId) {
+        return undefined;
+    }
+    socket.join(tenantRoom(userId));
+    return userId;
+}
+function tenantRoom(userId) {
+    return `tenant:${userId}`;
+}
+// Sockets without a user id keep the old broadcast, which is only safe with a single tenant
+function toTenant(namespace, userId) {
+    return userId ? namespace.to(tenantRoom(userId)) : namespace;
+}
+function tenantQueue(userId) {
+    const key = userId !== null && userId !== void 0 ? userId : '';
+    if (!messageQueues.has(key)) {
+        messageQueues.set(key, []);
+    }
+    return messageQueues.get(key);
+}
+function setTenantQueue(userId, queue) {
+    messageQueues.set(userId !== null && userId !== void 0 ? userId : '', queue);
+}
+// Events a messaging client may send inside a packedEvent frame; anything else is rejected
+const PACKED_EVENTS = new Set([
+    'newMessage',
+    'chatChanged',
+    'workspaceUpdate',
+    'messageSent',
+    'messageEdited',
+    'messageDeleted',
+]);
 // Handle connections in the Messaging namespace
 messagingNamespace.on('connection', (socket) => {
-    console.log('Messaging client connected:', socket.id);
+    const userId = joinTenantRoom(socket);
+    console.log('Messaging client connected:', socket.id, userId !== null && userId !== void 0 ? userId : '(no user id)');
+    const frontend = () => toTenant(frontendNamespace, userId);
+    // Set when the client negotiates the msgpack wire format; interned tables live per connection
+    let wireDecoder = null;
+    socket.on('wireCapabilities', (data, ack) => {
+        var _a;
+        if (((_a = data === null || data === void 0 ? void 0 : data.formats) === null || _a === void 0 ? void 0 : _a.includes('msgpack')) && typeof ack === 'function') {
+            wireDecoder = new wireFormat_1.WireDecoder();
+            ack({ format: 'msgpack', compression: ['zlib'] });
+        }
+    });
+    // Unpack a binary frame and dispatch it to the handler for the inner event
+    socket.on('packedEvent', (frame) => {
+        if (!wireDecoder) {
+            console.error('Received packedEvent before wire format negotiation');
+            return;
+        }
+        try {
+            const { event, payload } = wireDecoder.decode(frame);
+            if (!PACKED_EVENTS.has(event)) {
+                console.error('Rejected packedEvent with unknown event:', event);
+                socket.emit('error', { error: `Unknown packed event "${event}".` });
+                return;
+            }
+            for (const listener of socket.listeners(event)) {
+                listener(payload);
+            }
+        }
+        catch (error) {
+            console.error('Error handling packedEvent:', error);
+            socket.emit('error', { error: 'Could not handle packed event.' });
+        }
+    });
     socket.on('newMessage', (data) => __awaiter(void 0, void 0, void 0, function* () {
-        const { content, timestamp, user_id, hashed_sender_name } = data;
+        const { content, timestamp, user_id, hashed_sender_name, chat_id, context, thread_ts } = data;
         console.log("Received newMessage:", data);
         try {
-            const generatedResponses = yield (0, llm_1.processChatCompletion)(content, user_id, hashed_sender_name, timestamp);
+            const generatedResponses = yield (0, llm_1.processChatCompletion)(content, user_id, hashed_sender_name, timestamp, context);
             if (!generatedResponses || generatedResponses.length === 0) {
                 socket.emit('error', { error: 'Failed to generate responses.' });
                 return;
             }
             // Add message to queue with dummy responses
-            messageQueue.push({
+            tenantQueue(userId).push({
                 message: content,
                 timestamp: timestamp,
                 responses: generatedResponses,
                 hashed_sender_name: hashed_sender_name,
+                chat_id: chat_id,
+                thread_ts: thread_ts,
             });
             // Send to frontend
-            frontendNamespace.emit('newMessage', {
+            frontend().emit('newMessage', {
                 message: content,
                 timestamp: timestamp,
                 responses: generatedResponses,
                 hashed_sender_name: hashed_sender_name,
+                chat_id: chat_id,
+                thread_ts: thread_ts,
             });
             socket.emit('ack', { message: 'Message processed and stored in queue.' });
         }
@@ -86,23 +162,23 @@ messagingNamespace.on('connection', (socket) => {
     socket.on('chatChanged', (data) => {
         const { new_chat_id } = data;
         console.log(`Chat changed to: ${new_chat_id}`);
-        // Optionally, clear the messageQueue if it's specific to a chat
-        messageQueue = [];
+        // Optionally, clear the tenant's queue if it's specific to a chat
+        setTenantQueue(userId, []);
         // Emit 'chatChanged' event to the Front End
-        frontendNamespace.emit('chatChanged', { new_chat_id });
+        frontend().emit('chatChanged', { new_chat_id });
         // Acknowledge the Messaging Client
         socket.emit('ack', { message: 'Chat change processed.' });
     });
     socket.on('workspaceUpdate', (data) => {
         console.log('Received workspace update:', data);
         // Forward to frontend namespace
-        frontendNamespace.emit('workspaceUpdate', data);
+        frontend().emit('workspaceUpdate', data);
     });
     socket.on('selectConversation', (data) => {
         console.log('=== Backend Conversation Selection Flow ===');
         console.log('Received selectConversation event:', data);
         console.log('Forwarding to frontend namespace...');
-        frontendNamespace.emit('selectConversation', data);
+        frontend().emit('selectConversation', data);
         console.log('Event forwarded to frontend');
     });
     socket.on('disconnect', () => {
@@ -120,24 +196,40 @@ messagingNamespace.on('connection', (socket) => {
     socket.on('messageSent', (data) => {
         console.log('Message sent status from Slack:', data);
         // Forward to frontend
-        frontendNamespace.emit('messageSent', data);
+        frontend().emit('messageSent', data);
+    });
+    socket.on('messageEdited', (data) => {
+        const { message_id, content, timestamp } = data;
+        console.log(`Message ${message_id} edited:`, content);
+        // Keep the queued copy in sync with the edited content
+        setTenantQueue(userId, tenantQueue(userId).map((item) => item.timestamp === timestamp ? Object.assign(Object.assign({}, item), { message: content }) : item));
+        frontend().emit('messageEdited', data);
+    });
+    socket.on('messageDeleted', (data) => {
+        const { message_id, timestamp } = data;
+        console.log(`Message ${message_id} deleted`);
+        // Drop the deleted message so it no longer lingers in context
+        setTenantQueue(userId, tenantQueue(userId).filter((item) => item.timestamp !== timestamp));
+        frontend().emit('messageDeleted', data);
     });
 });
 // Handle connections in the Front End namespace
 frontendNamespace.on('connection', (socket) => {
-    console.log('Frontend client connected:', socket.id);
+    const userId = joinTenantRoom(socket);
+    console.log('Frontend client connected:', socket.id, userId !== null && userId !== void 0 ? userId : '(no user id)');
+    const messaging = () => toTenant(messagingNamespace, userId);
     socket.on('selectConversation', (data) => {
         console.log('=== Backend Conversation Selection Flow ===');
         console.log('Received selectConversation from frontend:', data);
         console.log('Forwarding to messaging namespace...');
-        messagingNamespace.emit('selectConversation', data);
+        messaging().emit('selectConversation', data);
         console.log('Event forwarded to messaging client');
     });
     socket.on('ack', (data) => {
         console.log(data);
     });
     socket.on('submitSelectedResponse', (data) => {
-        const { selected_response, currMessage, messageTimestamp } = data;
+        const { selected_response, currMessage, messageTimestamp, chatId, threadTs } = data;
         console.log("Received submitSelectedResponse:", data);
         // Input validation
         if (!selected_response) {
@@ -149,11 +241,17 @@ frontendNamespace.on('connection', (socket) => {
         // Acknowledge the Front End
         socket.emit('responseSubmitted', { message: 'Selected response submitted successfully.' });
         console.log("Response submitted to messaging client.");
+        // Reply in the chat (and thread) the message came from; older frontends only send its timestamp
+        const queuedMessage = messageTimestamp
+            ? tenantQueue(userId).find((item) => item.timestamp === messageTimestamp)
+            : undefined;
         // Send the selected response along with the message to the Messaging Client
-        messagingNamespace.emit('sendSelectedResponse', {
+        messaging().emit('sendSelectedResponse', {
             'selected_response': selected_response,
             'curr_message': currMessage,
             'message_timestamp': messageTimestamp,
+            'chat_id': chatId !== null && chatId !== void 0 ? chatId : queuedMessage === null || queuedMessage === void 0 ? void 0 : queuedMessage.chat_id,
+            'thread_ts': threadTs !== null && threadTs !== void 0 ? threadTs : queuedMessage === null || queuedMessage === void 0 ? void 0 : queuedMessage.thread_ts,
         });
         let QAPair = "";
         if (!currMessage) {
@@ -165,22 +263,22 @@ frontendNamespace.on('connection', (socket) => {
         let hashed_sender_name = "default_sender"; // Default value
         if (messageTimestamp) {
             // Retrieve the message from the queue to get hashed_sender_name
-            const messageItem = messageQueue.find((item) => item.timestamp === messageTimestamp);
+            const messageItem = tenantQueue(userId).find((item) => item.timestamp === messageTimestamp);
             if (messageItem) {
                 hashed_sender_name = messageItem.hashed_sender_name;
                 // Insert the Q&A pair into the database
-                (0, db_1.insertQAPair)("pearl@easyspeak-aac.com", QAPair, "pearl_message_test", messageTimestamp, hashed_sender_name);
+                (0, db_1.insertQAPair)(userId !== null && userId !== void 0 ? userId : DEFAULT_USER_ID, QAPair, "pearl_message_test", messageTimestamp, hashed_sender_name);
                 console.log("QAPair inserted into database: ", QAPair);
             }
             else {
                 console.error('Message not found in queue for timestamp:', messageTimestamp);
             }
             // Remove the message from the queue
-            messageQueue = messageQueue.filter((item) => item.timestamp !== messageTimestamp);
+            setTenantQueue(userId, tenantQueue(userId).filter((item) => item.timestamp !== messageTimestamp));
         }
         else {
             // Insert the Q&A pair into the database
-            (0, db_1.insertQAPair)("pearl@easyspeak-aac.com", QAPair, "pearl_message_test", Date.now(), hashed_sender_name);
+            (0, db_1.insertQAPair)(userId !== null && userId !== void 0 ? userId : DEFAULT_USER_ID, QAPair, "pearl_message_test", Date.now(), hashed_sender_name);
             console.log("QAPair inserted into database: ", QAPair);
         }
     });
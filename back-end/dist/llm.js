@@ -34,11 +34,28 @@ const getEmbedding = (content) => __awaiter(void 0, void 0, void 0, function* ()
     }
 });
 exports.getEmbedding = getEmbedding;
+// Expand a context window into one "speaker: content" line per message, oldest first.
+// The user is "me", the person being answered "them", and anyone else "person N" by sender table slot
+const decodeContextWindow = (context, hashed_sender_name) => {
+    return context.messages.map(([, senderIndex, content]) => {
+        let speaker = `person ${senderIndex + 1}`;
+        if (senderIndex === -1) {
+            speaker = 'me';
+        }
+        else if (context.senders[senderIndex] === hashed_sender_name) {
+            speaker = 'them';
+        }
+        return `${speaker}: ${content}`;
+    }).join('\n');
+};
 // Function to generate the system prompt using chunk text
-function generateSystemPrompt(content, user_id, hashed_sender_name, timestamp) {
+function generateSystemPrompt(content, user_id, hashed_sender_name, timestamp, context) {
     return __awaiter(this, void 0, void 0, function* () {
         const contentEmbedding = yield (0, exports.getEmbedding)(content);
-        const convoContext = yield (0, db_1.getCurrentConversationMessagesBySender)(hashed_sender_name);
+        // Prefer the client's context window over re-querying the current conversation
+        const convoContext = context
+            ? decodeContextWindow(context, hashed_sender_name)
+            : yield (0, db_1.getCurrentConversationMessagesBySender)(hashed_sender_name);
         const personContext = yield (0, db_1.getMessagesByHashedSenderName)(hashed_sender_name, 10);
         const similarContextLegacy = yield (0, db_1.getContextLegacy)(contentEmbedding, user_id, 5, 0.7);
         const styleContextLegacy = yield (0, db_1.getContextLegacy)(contentEmbedding, user_id, 20, 0.3);
@@ -87,9 +104,9 @@ const parseNumberedList = (inputString) => {
     }
     return items;
 };
-function processChatCompletion(query, user_id, hashed_sender_name, timestamp) {
+function processChatCompletion(query, user_id, hashed_sender_name, timestamp, context) {
     return __awaiter(this, void 0, void 0, function* () {
-        const systemPrompt = yield generateSystemPrompt(query, user_id, hashed_sender_name, timestamp);
+        const systemPrompt = yield generateSystemPrompt(query, user_id, hashed_sender_name, timestamp, context);
         const chatResponse = yield chatCompletionModel.getChatCompletion(systemPrompt, query);
         const responseList = parseNumberedList(chatResponse);
         console.log('Response:', responseList);
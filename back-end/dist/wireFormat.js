@@ -0,0 +1,53 @@
+"use strict";
+Object.defineProperty(exports, "__esModule", { value: true });
+exports.WireDecoder = void 0;
+const msgpack_1 = require("@msgpack/msgpack");
+const zlib_1 = require("zlib");
+// Mirrors messaging-client/wire_format.py
+const FLAG_COMPRESSED = 0x01;
+const WORKSPACE_LISTS = ['channels', 'privateChannels', 'dms', 'groupDms'];
+// Decodes packed frames from one messaging client connection
+class WireDecoder {
+    constructor() {
+        this.senders = new Map();
+        this.users = new Map();
+        this.chats = new Map();
+    }
+    decode(frame) {
+        var _a, _b, _c;
+        let body = frame.subarray(1);
+        if (frame[0] & FLAG_COMPRESSED) {
+            body = (0, zlib_1.inflateSync)(body);
+        }
+        const { e, p, d } = (0, msgpack_1.decode)(body);
+        for (const [ref, raw] of (_a = d === null || d === void 0 ? void 0 : d.s) !== null && _a !== void 0 ? _a : [])
+            this.senders.set(ref, Buffer.from(raw).toString('hex'));
+        for (const [ref, userId] of (_b = d === null || d === void 0 ? void 0 : d.u) !== null && _b !== void 0 ? _b : [])
+            this.users.set(ref, userId);
+        for (const [ref, id, name, type] of (_c = d === null || d === void 0 ? void 0 : d.c) !== null && _c !== void 0 ? _c : [])
+            this.chats.set(ref, { id, name, type });
+        return { event: e, payload: this.expand(p) };
+    }
+    expand(payload) {
+        var _a;
+        if (!payload || typeof payload !== 'object') {
+            return payload;
+        }
+        if (typeof payload.user_id === 'number') {
+            payload.user_id = this.users.get(payload.user_id);
+        }
+        if (typeof payload.hashed_sender_name === 'number') {
+            payload.hashed_sender_name = this.senders.get(payload.hashed_sender_name);
+        }
+        if ((_a = payload.context) === null || _a === void 0 ? void 0 : _a.senders) {
+            payload.context.senders = payload.context.senders.map((ref) => this.senders.get(ref));
+        }
+        for (const key of WORKSPACE_LISTS) {
+            if (Array.isArray(payload[key])) {
+                payload[key] = payload[key].map((ref) => (Object.assign({}, this.chats.get(ref))));
+            }
+        }
+        return payload;
+    }
+}
+exports.WireDecoder = WireDecoder;
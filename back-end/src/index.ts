@@ -4,9 +4,10 @@ import express from 'express';
 import dotenv from 'dotenv';
 import cors from 'cors';
 import http from 'http';
-import { Server } from 'socket.io';
+import { Namespace, Server, Socket } from 'socket.io';
 import { processChatCompletion } from './llm';
 import { insertQAPair } from './db';
+import { WireDecoder } from './wireFormat';
 
 dotenv.config();
 
@@ -47,10 +48,15 @@ interface MessageQueueItem {
   timestamp: number;
   responses: string[];
   hashed_sender_name: string;
+  chat_id?: string;
+  thread_ts?: string;
 }
 
-// Update the message queue initialization
-let messageQueue: MessageQueueItem[] = [];
+// Queued messages per tenant, so one tenant's chat change or reply never touches another's
+const messageQueues = new Map<string, MessageQueueItem[]>();
+
+// Database user for sockets that connect without a user id (single-tenant setups)
+const DEFAULT_USER_ID = "pearl@easyspeak-aac.com";
 
 // Add interface for workspace data
 interface WorkspaceData {
@@ -59,16 +65,91 @@ interface WorkspaceData {
   dms: Array<{ id: string; name: string }>;
 }
 
+// Both sides of a tenant join the room named after its user id, sent in the handshake auth
+function joinTenantRoom(socket: Socket): string | undefined {
+  const userId = socket.handshake.auth?.user_id;
+  if (typeof userId !== 'string' || !userId) {
+    return undefined;
+  }
+  socket.join(tenantRoom(userId));
+  return userId;
+}
+
+function tenantRoom(userId: string): string {
+  return `tenant:${userId}`;
+}
+
+// Sockets without a user id keep the old broadcast, which is only safe with a single tenant
+function toTenant(namespace: Namespace, userId: string | undefined) {
+  return userId ? namespace.to(tenantRoom(userId)) : namespace;
+}
+
+function tenantQueue(userId: string | undefined): MessageQueueItem[] {
+  const key = userId ?? '';
+  if (!messageQueues.has(key)) {
+    messageQueues.set(key, []);
+  }
+  return messageQueues.get(key)!;
+}
+
+function setTenantQueue(userId: string | undefined, queue: MessageQueueItem[]) {
+  messageQueues.set(userId ?? '', queue);
+}
+
+// Events a messaging client may send inside a packedEvent frame; anything else is rejected
+const PACKED_EVENTS = new Set([
+  'newMessage',
+  'chatChanged',
+  'workspaceUpdate',
+  'messageSent',
+  'messageEdited',
+  'messageDeleted',
+]);
+
 // Handle connections in the Messaging namespace
 messagingNamespace.on('connection', (socket) => {
-  console.log('Messaging client connected:', socket.id);
+  const userId = joinTenantRoom(socket);
+  console.log('Messaging client connected:', socket.id, userId ?? '(no user id)');
+  const frontend = () => toTenant(frontendNamespace, userId);
+
+  // Set when the client negotiates the msgpack wire format; interned tables live per connection
+  let wireDecoder: WireDecoder | null = null;
+
+  socket.on('wireCapabilities', (data, ack) => {
+    if (data?.formats?.includes('msgpack') && typeof ack === 'function') {
+      wireDecoder = new WireDecoder();
+      ack({ format: 'msgpack', compression: ['zlib'] });
+    }
+  });
+
+  // Unpack a binary frame and dispatch it to the handler for the inner event
+  socket.on('packedEvent', (frame: Buffer) => {
+    if (!wireDecoder) {
+      console.error('Received packedEvent before wire format negotiation');
+      return;
+    }
+    try {
+      const { event, payload } = wireDecoder.decode(frame);
+      if (!PACKED_EVENTS.has(event)) {
+        console.error('Rejected packedEvent with unknown event:', event);
+        socket.emit('error', { error: `Unknown packed event "${event}".` });
+        return;
+      }
+      for (const listener of socket.listeners(event)) {
+        listener(payload);
+      }
+    } catch (error) {
+      console.error('Error handling packedEvent:', error);
+      socket.emit('error', { error: 'Could not handle packed event.' });
+    }
+  });
 
   socket.on('newMessage', async (data) => {
-    const { content, timestamp, user_id, hashed_sender_name } = data;
+    const { content, timestamp, user_id, hashed_sender_name, chat_id, context, thread_ts } = data;
     console.log("Received newMessage:", data);
 
     try {
-      const generatedResponses = await processChatCompletion(content, user_id, hashed_sender_name, timestamp);
+      const generatedResponses = await processChatCompletion(content, user_id, hashed_sender_name, timestamp, context);
 
       if (!generatedResponses || generatedResponses.length === 0) {
         socket.emit('error', { error: 'Failed to generate responses.' });
@@ -76,19 +157,23 @@ messagingNamespace.on('connection', (socket) => {
       }
 
       // Add message to queue with dummy responses
-      messageQueue.push({
+      tenantQueue(userId).push({
         message: content,
         timestamp: timestamp,
         responses: generatedResponses,
         hashed_sender_name: hashed_sender_name,
+        chat_id: chat_id,
+        thread_ts: thread_ts,
       });
 
       // Send to frontend
-      frontendNamespace.emit('newMessage', {
+      frontend().emit('newMessage', {
         message: content,
         timestamp: timestamp,
         responses: generatedResponses,
         hashed_sender_name: hashed_sender_name,
+        chat_id: chat_id,
+        thread_ts: thread_ts,
       });
 
       socket.emit('ack', { message: 'Message processed and stored in queue.' });
@@ -103,11 +188,11 @@ messagingNamespace.on('connection', (socket) => {
     const { new_chat_id } = data;
     console.log(`Chat changed to: ${new_chat_id}`);
 
-    // Optionally, clear the messageQueue if it's specific to a chat
-    messageQueue = [];
+    // Optionally, clear the tenant's queue if it's specific to a chat
+    setTenantQueue(userId, []);
 
     // Emit 'chatChanged' event to the Front End
-    frontendNamespace.emit('chatChanged', { new_chat_id });
+    frontend().emit('chatChanged', { new_chat_id });
 
     // Acknowledge the Messaging Client
     socket.emit('ack', { message: 'Chat change processed.' });
@@ -116,14 +201,14 @@ messagingNamespace.on('connection', (socket) => {
   socket.on('workspaceUpdate', (data: WorkspaceData) => {
     console.log('Received workspace update:', data);
     // Forward to frontend namespace
-    frontendNamespace.emit('workspaceUpdate', data);
+    frontend().emit('workspaceUpdate', data);
   });
 
   socket.on('selectConversation', (data) => {
     console.log('=== Backend Conversation Selection Flow ===');
     console.log('Received selectConversation event:', data);
     console.log('Forwarding to frontend namespace...');
-    frontendNamespace.emit('selectConversation', data);
+    frontend().emit('selectConversation', data);
     console.log('Event forwarded to frontend');
   });
 
@@ -145,19 +230,41 @@ messagingNamespace.on('connection', (socket) => {
   socket.on('messageSent', (data) => {
     console.log('Message sent status from Slack:', data);
     // Forward to frontend
-    frontendNamespace.emit('messageSent', data);
+    frontend().emit('messageSent', data);
+  });
+
+  socket.on('messageEdited', (data) => {
+    const { message_id, content, timestamp } = data;
+    console.log(`Message ${message_id} edited:`, content);
+
+    // Keep the queued copy in sync with the edited content
+    setTenantQueue(userId, tenantQueue(userId).map((item) =>
+      item.timestamp === timestamp ? { ...item, message: content } : item
+    ));
+    frontend().emit('messageEdited', data);
+  });
+
+  socket.on('messageDeleted', (data) => {
+    const { message_id, timestamp } = data;
+    console.log(`Message ${message_id} deleted`);
+
+    // Drop the deleted message so it no longer lingers in context
+    setTenantQueue(userId, tenantQueue(userId).filter((item) => item.timestamp !== timestamp));
+    frontend().emit('messageDeleted', data);
   });
 });
 
 // Handle connections in the Front End namespace
 frontendNamespace.on('connection', (socket) => {
-  console.log('Frontend client connected:', socket.id);
+  const userId = joinTenantRoom(socket);
+  console.log('Frontend client connected:', socket.id, userId ?? '(no user id)');
+  const messaging = () => toTenant(messagingNamespace, userId);
 
   socket.on('selectConversation', (data) => {
     console.log('=== Backend Conversation Selection Flow ===');
     console.log('Received selectConversation from frontend:', data);
     console.log('Forwarding to messaging namespace...');
-    messagingNamespace.emit('selectConversation', data);
+    messaging().emit('selectConversation', data);
     console.log('Event forwarded to messaging client');
   });
 
@@ -166,7 +273,7 @@ frontendNamespace.on('connection', (socket) => {
   });
 
   socket.on('submitSelectedResponse', (data) => {
-    const { selected_response, currMessage, messageTimestamp } = data;
+    const { selected_response, currMessage, messageTimestamp, chatId, threadTs } = data;
 
     console.log("Received submitSelectedResponse:", data);
 
@@ -183,11 +290,18 @@ frontendNamespace.on('connection', (socket) => {
     socket.emit('responseSubmitted', { message: 'Selected response submitted successfully.' });
     console.log("Response submitted to messaging client.");
 
+    // Reply in the chat (and thread) the message came from; older frontends only send its timestamp
+    const queuedMessage = messageTimestamp
+      ? tenantQueue(userId).find((item) => item.timestamp === messageTimestamp)
+      : undefined;
+
     // Send the selected response along with the message to the Messaging Client
-    messagingNamespace.emit('sendSelectedResponse', {
+    messaging().emit('sendSelectedResponse', {
       'selected_response': selected_response,
       'curr_message': currMessage,
       'message_timestamp': messageTimestamp,
+      'chat_id': chatId ?? queuedMessage?.chat_id,
+      'thread_ts': threadTs ?? queuedMessage?.thread_ts,
     });
 
     let QAPair = "";
@@ -202,7 +316,7 @@ frontendNamespace.on('connection', (socket) => {
 
     if (messageTimestamp) {
       // Retrieve the message from the queue to get hashed_sender_name
-      const messageItem = messageQueue.find(
+      const messageItem = tenantQueue(userId).find(
         (item) => item.timestamp === messageTimestamp
       );
 
@@ -211,7 +325,7 @@ frontendNamespace.on('connection', (socket) => {
 
         // Insert the Q&A pair into the database
         insertQAPair(
-          "pearl@easyspeak-aac.com",
+          userId ?? DEFAULT_USER_ID,
           QAPair,
           "pearl_message_test",
           messageTimestamp,
@@ -223,13 +337,13 @@ frontendNamespace.on('connection', (socket) => {
       }
 
       // Remove the message from the queue
-      messageQueue = messageQueue.filter(
+      setTenantQueue(userId, tenantQueue(userId).filter(
         (item) => item.timestamp !== messageTimestamp
-      );
+      ));
     } else {
       // Insert the Q&A pair into the database
       insertQAPair(
-        "pearl@easyspeak-aac.com",
+        userId ?? DEFAULT_USER_ID,
         QAPair,
         "pearl_message_test",
         Date.now(),
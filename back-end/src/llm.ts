@@ -21,12 +21,36 @@ export const getEmbedding = async (content: string) => {
   }
 }
 
+// Delta-encoded context window attached by the messaging client
+export interface ContextWindow {
+  base_timestamp: number;
+  senders: string[];
+  messages: Array<[number, number, string]>; // [timestamp delta, sender index (-1 for the user), content]
+}
+
+// Expand a context window into one "speaker: content" line per message, oldest first.
+// The user is "me", the person being answered "them", and anyone else "person N" by sender table slot
+const decodeContextWindow = (context: ContextWindow, hashed_sender_name: string) => {
+  return context.messages.map(([, senderIndex, content]) => {
+    let speaker = `person ${senderIndex + 1}`;
+    if (senderIndex === -1) {
+      speaker = 'me';
+    } else if (context.senders[senderIndex] === hashed_sender_name) {
+      speaker = 'them';
+    }
+    return `${speaker}: ${content}`;
+  }).join('\n');
+}
+
 // Function to generate the system prompt using chunk text
-async function generateSystemPrompt(content: string, user_id: string, hashed_sender_name: string, timestamp: number) {
+async function generateSystemPrompt(content: string, user_id: string, hashed_sender_name: string, timestamp: number, context?: ContextWindow) {
 
   const contentEmbedding = await getEmbedding(content);
 
-  const convoContext = await getCurrentConversationMessagesBySender(hashed_sender_name);
+  // Prefer the client's context window over re-querying the current conversation
+  const convoContext = context
+    ? decodeContextWindow(context, hashed_sender_name)
+    : await getCurrentConversationMessagesBySender(hashed_sender_name);
 
   const personContext = await getMessagesByHashedSenderName(hashed_sender_name, 10);
 
@@ -85,8 +109,8 @@ const parseNumberedList = (inputString: string) => {
   return items;
 }
 
-export async function processChatCompletion(query: string, user_id: string, hashed_sender_name: string, timestamp: number) {
-  const systemPrompt = await generateSystemPrompt(query, user_id, hashed_sender_name, timestamp);
+export async function processChatCompletion(query: string, user_id: string, hashed_sender_name: string, timestamp: number, context?: ContextWindow) {
+  const systemPrompt = await generateSystemPrompt(query, user_id, hashed_sender_name, timestamp, context);
   const chatResponse = await chatCompletionModel.getChatCompletion(systemPrompt, query);
   const responseList: string[] = parseNumberedList(chatResponse);
   console.log('Response:', responseList);
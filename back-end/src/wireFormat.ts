@@ -0,0 +1,65 @@
+import { decode } from '@msgpack/msgpack';
+import { inflateSync } from 'zlib';
+
+// Mirrors messaging-client/wire_format.py
+const FLAG_COMPRESSED = 0x01;
+const WORKSPACE_LISTS = ['channels', 'privateChannels', 'dms', 'groupDms'];
+
+interface ChatEntry {
+  id: string;
+  name: string;
+  type: string;
+}
+
+interface PackedFrame {
+  e: string;
+  p: any;
+  d?: {
+    s?: Array<[number, Uint8Array]>;
+    u?: Array<[number, string]>;
+    c?: Array<[number, string, string, string]>;
+  };
+}
+
+// Decodes packed frames from one messaging client connection
+export class WireDecoder {
+  private senders = new Map<number, string>();
+  private users = new Map<number, string>();
+  private chats = new Map<number, ChatEntry>();
+
+  decode(frame: Buffer): { event: string; payload: any } {
+    let body = frame.subarray(1);
+    if (frame[0] & FLAG_COMPRESSED) {
+      body = inflateSync(body);
+    }
+    const { e, p, d } = decode(body) as PackedFrame;
+
+    for (const [ref, raw] of d?.s ?? []) this.senders.set(ref, Buffer.from(raw).toString('hex'));
+    for (const [ref, userId] of d?.u ?? []) this.users.set(ref, userId);
+    for (const [ref, id, name, type] of d?.c ?? []) this.chats.set(ref, { id, name, type });
+
+    return { event: e, payload: this.expand(p) };
+  }
+
+  private expand(payload: any) {
+    if (!payload || typeof payload !== 'object') {
+      return payload;
+    }
+
+    if (typeof payload.user_id === 'number') {
+      payload.user_id = this.users.get(payload.user_id);
+    }
+    if (typeof payload.hashed_sender_name === 'number') {
+      payload.hashed_sender_name = this.senders.get(payload.hashed_sender_name);
+    }
+    if (payload.context?.senders) {
+      payload.context.senders = payload.context.senders.map((ref: number) => this.senders.get(ref));
+    }
+    for (const key of WORKSPACE_LISTS) {
+      if (Array.isArray(payload[key])) {
+        payload[key] = payload[key].map((ref: number) => ({ ...this.chats.get(ref) }));
+      }
+    }
+    return payload;
+  }
+}
@@ -14,6 +14,8 @@ interface Message {
   responses: string[];
   timestamp: number;
   sender: string;
+  chat_id?: string;
+  thread_ts?: string;
 }
 
 const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderName }) => {
@@ -22,6 +24,8 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderNam
   const [messages, setMessages] = useState<Message[]>([]);
   const [status, setStatus] = useState<string>('');
   const messagesEndRef = useRef<HTMLDivElement | null>(null);
+  // Latest messages for socket handlers, whose closures outlive renders
+  const messagesRef = useRef<Message[]>([]);
   const socketRef = useRef<any>(null);
   const [isSendingState, setIsSendingState] = useState<boolean>(false);
   const [isMessageSentToSlack, setIsMessageSentToSlack] = useState<boolean>(false);
@@ -34,6 +38,19 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderNam
     scrollToCurrentMessage();
   }, [messageIndex, messages]);
 
+  useEffect(() => {
+    messagesRef.current = messages;
+  }, [messages]);
+
+  // Removes a message by timestamp, keeping the one on screen selected
+  const removeMessage = (timestamp: number) => {
+    const removedIndex = messagesRef.current.findIndex(msg => msg.timestamp === timestamp);
+    if (removedIndex === -1) return;
+
+    setMessages(prevMessages => prevMessages.filter(msg => msg.timestamp !== timestamp));
+    setMessageIndex(prev => (removedIndex <= prev ? Math.max(0, prev - 1) : prev));
+  };
+
   useEffect(() => {
     const socket = SocketService.getSocket();
     socketRef.current = socket;
@@ -46,7 +63,7 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderNam
 
     socket.on('newMessage', (data: any) => {
       console.log('Received newMessage:', data);
-      const { message, timestamp, responses, sender } = data;
+      const { message, timestamp, responses, sender, chat_id, thread_ts } = data;
 
       setMessages(prevMessages => {
         if (prevMessages.some(msg => msg.timestamp === timestamp)) {
@@ -57,7 +74,9 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderNam
           message,
           responses,
           timestamp,
-          sender
+          sender,
+          chat_id,
+          thread_ts
         }];
         newMessages.sort((a, b) => a.timestamp - b.timestamp);
         
@@ -92,12 +111,9 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderNam
         setStatus('Message sent successfully');
         setNewMessage('');
         
-        // Update messages if needed
-        if (messages[messageIndex]) {
-          setMessages(prevMessages => 
-            prevMessages.filter(msg => msg.timestamp !== messages[messageIndex].timestamp)
-          );
-          setMessageIndex(prev => Math.max(0, prev - 1));
+        // Drop the message this reply answered; with batched delivery it may no longer be on screen
+        if (data.message_timestamp != null) {
+          removeMessage(data.message_timestamp);
         }
       } else {
         setStatus(`Error sending message: ${data.message}`);
@@ -105,12 +121,29 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderNam
       }
     });
 
+    // Edits and deletions in Slack are keyed by the same timestamp as newMessage
+    socket.on('messageEdited', (data: any) => {
+      console.log('Message edited:', data);
+      const { timestamp, content } = data;
+
+      setMessages(prevMessages => prevMessages.map(msg =>
+        msg.timestamp === timestamp ? { ...msg, message: content } : msg
+      ));
+    });
+
+    socket.on('messageDeleted', (data: any) => {
+      console.log('Message deleted:', data);
+      removeMessage(data.timestamp);
+    });
+
     return () => {
       socket.off('newMessage');
       socket.off('chatChanged');
       socket.off('error');
       socket.off('ack');
       socket.off('messageSent');
+      socket.off('messageEdited');
+      socket.off('messageDeleted');
     };
   }, [selectedConversation, isSendingState]);
 
@@ -124,7 +157,9 @@ const ChatWindow: React.FC<ChatWindowProps> = ({ selectedConversation, senderNam
     socketRef.current.emit('submitSelectedResponse', {
       selected_response: newMessage,
       currMessage: messages[messageIndex]?.message || '',
-      messageTimestamp: messages[messageIndex]?.timestamp || null
+      messageTimestamp: messages[messageIndex]?.timestamp || null,
+      chatId: messages[messageIndex]?.chat_id,
+      threadTs: messages[messageIndex]?.thread_ts
     });
   };
 
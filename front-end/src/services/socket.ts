@@ -10,7 +10,9 @@ class SocketService {
         transports: ['websocket'],
         upgrade: false,
         forceNew: false, // Changed to false to prevent multiple connections
-        path: '/socket.io'
+        path: '/socket.io',
+        // The backend routes replies and selections to the messaging client with this user id
+        auth: { user_id: process.env.REACT_APP_USER_ID }
       });
       
       this.isInitialized = true;
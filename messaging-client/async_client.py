@@ -0,0 +1,378 @@
+"""
+Asyncio core for the messaging client.
+
+Scans Slack and talks to the backend like messaging_slack, with the same
+events and payloads, but runs everything on one event loop:
+
+- the /messaging namespace is served by a socketio.AsyncClient;
+- WebDriver calls run one at a time on a dedicated executor thread;
+- polling, sidebar sync, reply sending, conversation selection and driver
+  health checks are separate tasks in one task group, cancelled together
+  on shutdown.
+
+Every driver call has a deadline, counted from when it starts running. A call
+that misses it leaves its thread behind and rebuilds the WebDriver session,
+which also unblocks that thread. Between calls, a probe that fails rebuilds
+the session too, so a dead browser is noticed before the next poll runs into it.
+
+    python async_client.py
+"""
+import asyncio
+import logging
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import socketio
+
+import messaging_slack as client
+from client_logging import setup_logging
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = 15  # Seconds to reach the backend at startup
+ATTACH_TIMEOUT = 30  # Seconds to attach to Chrome at startup
+POLL_CYCLE_TIMEOUT = float(os.getenv("POLL_CYCLE_TIMEOUT", "60"))  # Seconds one poll cycle may take
+SIDEBAR_SYNC_INTERVAL = 5  # Seconds between workspaceUpdate emits, the threaded client's poll cadence
+SIDEBAR_SYNC_TIMEOUT = 15  # Seconds one sidebar sync may take
+SEND_BATCH_TIMEOUT = float(os.getenv("SEND_BATCH_TIMEOUT", "120"))  # Seconds to deliver one batch of replies
+SELECT_TIMEOUT = 30  # Seconds to open a selected conversation and send its initial messages
+RECOVERY_TIMEOUT = 60  # Seconds to rebuild the WebDriver session
+HEALTH_CHECK_TIMEOUT = client.DRIVER_PROBE_TIMEOUT * 3  # Seconds one probe may take; probe_driver gives up after twice its own timeout
+SHUTDOWN_TIMEOUT = 5  # Seconds to disconnect and quit the driver on shutdown
+
+
+class DriverReset(Exception):
+    """A driver call was dropped, unstarted, because the session was rebuilt first."""
+
+
+class DriverExecutor:
+    """Runs WebDriver calls one at a time on a dedicated thread, each with a deadline."""
+
+    def __init__(self):
+        self.pool = self._new_pool()
+
+    @staticmethod
+    def _new_pool():
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="webdriver")
+
+    async def call(self, timeout, fn, *args):
+        """
+        Runs fn(*args) on the driver thread. The deadline starts once fn does,
+        not while it waits behind earlier calls. On timeout, rebuilds the driver
+        and raises asyncio.TimeoutError; raises DriverReset if fn was still
+        queued when another call's timeout rebuilt the driver.
+        """
+        pool = self.pool
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        def run():
+            loop.call_soon_threadsafe(started.set)
+            return fn(*args)
+
+        future = loop.run_in_executor(pool, run)
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            # Queued calls need no deadline of their own: the call ahead of them has one
+            await asyncio.wait({future, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"WebDriver call {fn.__name__} took over {timeout}s; rebuilding the session.")
+            await self.recover(pool)
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            if pool is not self.pool and not asyncio.current_task().cancelling():
+                raise DriverReset(f"WebDriver call {fn.__name__} dropped by a session rebuild") from None
+            raise
+        finally:
+            waiter.cancel()
+
+    async def recover(self, stuck_pool):
+        # Another call already replaced this pool
+        if stuck_pool is not self.pool:
+            return
+
+        # The stuck thread cannot be interrupted; leave it behind along with anything queued after it
+        self.pool = self._new_pool()
+        stuck_pool.shutdown(wait=False, cancel_futures=True)
+
+        try:
+            await asyncio.wait_for(
+                asyncio.get_running_loop().run_in_executor(self.pool, client.recover_driver), RECOVERY_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.error("Rebuilding the WebDriver session timed out.")
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncEmitter:
+    """
+    Stands in for the Socket.IO client inside messaging_slack, so its
+    functions can emit from the driver thread: each emit is scheduled on the
+    event loop without waiting for it to be sent.
+    """
+
+    def __init__(self, sio, loop):
+        self.sio = sio
+        self.loop = loop
+
+    @property
+    def connected(self):
+        return self.sio.connected
+
+    def emit(self, event, data=None, namespace=None, callback=None):
+        future = asyncio.run_coroutine_threadsafe(
+            self.sio.emit(event, data, namespace=namespace, callback=callback), self.loop
+        )
+
+        def log_failure(done):
+            if not done.cancelled() and done.exception() is not None:
+                logger.error(f"Failed to emit '{event}' event: {done.exception()}")
+
+        future.add_done_callback(log_failure)
+
+    def disconnect(self):
+        asyncio.run_coroutine_threadsafe(self.sio.disconnect(), self.loop)
+
+
+def poll_and_save(state):
+    client.poll_once(state)
+    client.save_client_state(state.last_sent_message_id_per_chat)
+
+
+async def poll_task(driver_calls, selection, state):
+    """Polls the selected conversation every POLL_INTERVAL seconds."""
+    while True:
+        client.last_poll_cycle_at = time.monotonic()
+        client.poll_cycle_id += 1
+
+        if not client.selected_conversation:
+            client.hot_logger.info("Waiting for conversation selection...")
+            try:
+                await asyncio.wait_for(selection.wait(), client.POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await driver_calls.call(POLL_CYCLE_TIMEOUT, poll_and_save, state)
+        except (asyncio.TimeoutError, DriverReset):
+            pass
+        except Exception:
+            logger.exception("Error in poll task.")
+
+        await asyncio.sleep(client.POLL_INTERVAL)
+
+
+async def sidebar_task(driver_calls):
+    """Emits workspaceUpdate every SIDEBAR_SYNC_INTERVAL seconds."""
+    while True:
+        try:
+            await driver_calls.call(SIDEBAR_SYNC_TIMEOUT, client.emit_workspace_update)
+        except (asyncio.TimeoutError, DriverReset):
+            pass
+        except Exception:
+            logger.exception("Error in sidebar sync task.")
+        await asyncio.sleep(SIDEBAR_SYNC_INTERVAL)
+
+
+async def send_task(driver_calls, outbound_ready):
+    """Delivers queued replies in batches as soon as they arrive."""
+    while True:
+        await outbound_ready.wait()
+        outbound_ready.clear()
+
+        batch = client.take_outbound_batch(block=False)
+        if not batch:
+            continue
+        try:
+            await driver_calls.call(SEND_BATCH_TIMEOUT, client.deliver_outbound_batch, batch)
+        except asyncio.TimeoutError:
+            # Some replies in the batch may have gone out before the deadline
+            for _, items in batch:
+                for item in items:
+                    client.report_send_status('error', "Delivery timed out; the reply may not have been sent.", item)
+        except DriverReset:
+            # Nothing was typed yet, so queue the batch again
+            for chat_id, items in batch:
+                for item in items:
+                    client.enqueue_outbound_response(
+                        chat_id, item['response'], item['message_timestamp'], item.get('thread_ts')
+                    )
+            outbound_ready.set()
+        except Exception:
+            logger.exception("Error in send task.")
+
+
+async def select_task(driver_calls, selections, selection):
+    """Opens conversations selected from the frontend, one at a time."""
+    while True:
+        data = await selections.get()
+        try:
+            await driver_calls.call(SELECT_TIMEOUT, client.on_select_conversation, data)
+            selection.set()
+        except DriverReset:
+            # Unless a newer selection is waiting, try this one again on the new session
+            if selections.empty():
+                selections.put_nowait(data)
+        except Exception:
+            # on_select_conversation logs its own failures and clears the selection
+            if not client.selected_conversation:
+                selection.clear()
+
+
+def register_handlers(sio, selections, outbound_ready):
+    namespace = client.MESSAGING_NAMESPACE
+
+    # Handlers that never touch the driver run directly on the loop
+    sio.on("connect", client.connect, namespace=namespace)
+    sio.on("connect_error", client.connect_error, namespace=namespace)
+    sio.on("disconnect", client.disconnect, namespace=namespace)
+    sio.on("startProfiler", client.on_start_profiler, namespace=namespace)
+    sio.on("setHotPathLogging", client.on_set_hot_path_logging, namespace=namespace)
+
+    @sio.on("sendSelectedResponse", namespace=namespace)
+    async def on_send_selected_response(data):
+        client.on_send_selected_response(data)
+        outbound_ready.set()
+
+    # Handlers run inline with packet processing, so driver work is handed to select_task
+    @sio.on("selectConversation", namespace=namespace)
+    async def on_select_conversation(data):
+        selections.put_nowait(data)
+
+
+async def attach(driver_calls):
+    """Attaches to Chrome; an attach that times out is finished by the session rebuild it triggers."""
+    try:
+        await driver_calls.call(ATTACH_TIMEOUT, client.attach_driver, False)
+    except asyncio.TimeoutError:
+        if client.driver is None:
+            raise
+        await driver_calls.call(ATTACH_TIMEOUT, client.resolve_self_member_ids, client.driver)
+
+
+async def health_task(driver_calls):
+    """Probes the driver every WATCHDOG_INTERVAL seconds and rebuilds a session that fails."""
+    while True:
+        await asyncio.sleep(client.WATCHDOG_INTERVAL)
+
+        pool = driver_calls.pool
+        try:
+            # Calls run one at a time, so a driver_lock still held here belongs to a thread left behind
+            healthy = await driver_calls.call(HEALTH_CHECK_TIMEOUT, client.probe_driver)
+        except (asyncio.TimeoutError, DriverReset):
+            # A probe that timed out has already rebuilt the session; a dropped one was beaten to it
+            continue
+        except Exception:
+            logger.exception("Error in health check task.")
+            continue
+
+        if not healthy:
+            logger.warning("Driver probe failed (probe=%s); rebuilding the session.", healthy)
+            down_since = time.monotonic()
+            await driver_calls.recover(pool)
+            client.report_metric("driver_recovery_seconds", time.monotonic() - down_since)
+
+
+async def restore_conversation(driver_calls, selection, state):
+    """Reopens the conversation saved in STATE_FILE, if any."""
+    client.thread_cursors.update(state.get('thread_cursors') or {})
+
+    restored = state.get('selected_conversation')
+    if not restored:
+        return
+    try:
+        await driver_calls.call(
+            SELECT_TIMEOUT, client.navigate_to_conversation, restored['id'], restored['name'], restored['type']
+        )
+        client.selected_conversation = restored
+        selection.set()
+        logger.info(f"Restored conversation: {restored['name'] or restored['id']}")
+    except Exception:
+        logger.exception("Could not restore the last conversation; waiting for a selection.")
+
+
+async def shutdown(sio, driver_calls):
+    client.running = False
+    try:
+        await asyncio.wait_for(sio.disconnect(), SHUTDOWN_TIMEOUT)
+    except Exception:
+        pass
+    try:
+        await asyncio.wait_for(
+            asyncio.get_running_loop().run_in_executor(None, client.quit_driver_quietly, client.driver), SHUTDOWN_TIMEOUT
+        )
+    except Exception:
+        pass
+    driver_calls.shutdown()
+
+
+async def run():
+    loop = asyncio.get_running_loop()
+
+    sio = socketio.AsyncClient(
+        logger=client.SOCKETIO_DEBUG_LOGS,
+        engineio_logger=client.SOCKETIO_DEBUG_LOGS,
+        reconnection=True,
+        reconnection_attempts=0,
+        reconnection_delay=1,
+    )
+    client.sio = AsyncEmitter(sio, loop)
+
+    driver_calls = DriverExecutor()
+    selection = asyncio.Event()
+    selections = asyncio.Queue()
+    outbound_ready = asyncio.Event()
+    register_handlers(sio, selections, outbound_ready)
+
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        # Connect and attach concurrently
+        await asyncio.gather(
+            asyncio.wait_for(
+                sio.connect(
+                    client.WEBSOCKET_SERVER_URL,
+                    namespaces=[client.MESSAGING_NAMESPACE],
+                    transports=["websocket"],
+                    auth={"user_id": client.USER_ID},
+                    socketio_path="/socket.io",
+                ),
+                CONNECT_TIMEOUT,
+            ),
+            attach(driver_calls),
+        )
+
+        saved_state = client.load_client_state() or {}
+        await restore_conversation(driver_calls, selection, saved_state)
+
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(poll_task(driver_calls, selection, client.PollState(saved_state.get('cursors')))),
+                group.create_task(sidebar_task(driver_calls)),
+                group.create_task(send_task(driver_calls, outbound_ready)),
+                group.create_task(select_task(driver_calls, selections, selection)),
+                group.create_task(health_task(driver_calls)),
+            ]
+            await stop.wait()
+            logger.info("Shutting down messaging client...")
+            for task in tasks:
+                task.cancel()
+    finally:
+        await shutdown(sio, driver_calls)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run())
+    except Exception:
+        logger.exception("Async messaging client stopped.")
@@ -0,0 +1,144 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOG_FILE = os.getenv("LOG_FILE")  # JSON lines go to stderr when unset
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "5"))  # Records allowed per call site per window
+LOG_RATE_WINDOW = float(os.getenv("LOG_RATE_WINDOW", "10"))  # Seconds
+HOT_PATH_LOGGING = os.getenv("HOT_PATH_LOGGING", "1") != "0"
+
+# Logger for per-cycle and per-message logs; can be switched off at runtime
+HOT_LOGGER_NAME = "hot"
+
+# Attributes every LogRecord has, so anything else was passed via extra=
+_STANDARD_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including any extra= fields."""
+
+    def format(self, record):
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.processName,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most LOG_RATE_LIMIT records per call site through each LOG_RATE_WINDOW.
+    Warnings, errors and metric records always pass. The next record let
+    through from a site carries the number it suppressed.
+    """
+
+    def __init__(self, limit=LOG_RATE_LIMIT, window=LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.sites = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        # Every metric is logged from the same call site in report_metric
+        if record.levelno >= logging.WARNING or hasattr(record, "metric"):
+            return True
+
+        site = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self.lock:
+            window_start, count, suppressed = self.sites.get(site, (now, 0, 0))
+            if now - window_start >= self.window:
+                window_start, count = now, 0
+            if count >= self.limit:
+                self.sites[site] = (window_start, count, suppressed + 1)
+                return False
+            self.sites[site] = (window_start, count + 1, 0)
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records without formatting them, leaving message interpolation and
+    JSON encoding to the background listener thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level=logging.INFO):
+    """
+    Routes all logging through a queue to a background writer emitting JSON lines.
+    Safe to call more than once; later calls replace the previous setup.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    if LOG_FILE:
+        writer = logging.FileHandler(LOG_FILE)
+    else:
+        writer = logging.StreamHandler(sys.stderr)
+    writer.setFormatter(JsonLineFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+
+    set_hot_path_logging(HOT_PATH_LOGGING)
+
+
+def set_hot_path_logging(enabled):
+    """Turns hot-path logging on or off without restarting."""
+    logging.getLogger(HOT_LOGGER_NAME).disabled = not enabled
+
+
+def toggle_hot_path_logging():
+    """Flips hot-path logging and returns the new state."""
+    enabled = logging.getLogger(HOT_LOGGER_NAME).disabled
+    set_hot_path_logging(enabled)
+    return enabled
+
+
+def stop_logging():
+    """Flushes queued records and stops the background writer."""
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# Flush anything still queued when the process exits
+atexit.register(stop_logging)
@@ -1,16 +1,11 @@
 import time
+started_at = time.monotonic()  # Baseline for the startup metrics
 from socketio import Client  # Change this line
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys  # For simulating key presses
 from selenium.common.exceptions import (
     NoSuchElementException,
     ElementNotInteractableException,
     TimeoutException,
 )
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import os
 import logging
 import signal
@@ -18,13 +13,23 @@ import sys
 import uuid
 import hmac
 import hashlib
+import json
+import re
 import urllib.parse  # For parsing URLs
+import shlex
+import subprocess
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from wire_format import PACKED_EVENT, WIRE_FORMAT_JSON, WIRE_FORMAT_MSGPACK, WireEncoder, msgpack
+from sampling_profiler import SamplingProfiler
+from client_logging import HOT_LOGGER_NAME, setup_logging, set_hot_path_logging, toggle_hot_path_logging
 
 # Setup Logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
+setup_logging()
 logger = logging.getLogger(__name__)
+# Per-cycle and per-message logs; toggled at runtime with SIGUSR2 or the setHotPathLogging event
+hot_logger = logging.getLogger(HOT_LOGGER_NAME)
 
 # Configuration
 WEBSOCKET_SERVER_URL = os.getenv("WEBSOCKET_SERVER_URL", "http://localhost:3001")
@@ -32,12 +37,60 @@ USER_ID = os.getenv(
     "USER_ID", "pearl@easyspeak-aac.com"
 )  # Replace with your actual user ID or email
 PEPPER = os.getenv('PEPPER', 'SuperSecretPepperValue')  # Securely store this in production
+SELF_NAME = os.getenv("SELF_NAME", "pearl").lower()  # Own display name, matched exactly (case-insensitive) until a member id is known
+SELF_MEMBER_IDS = os.getenv("SELF_MEMBER_IDS", "")  # Comma-separated Slack member ids of 'me'; read from Slack if unset
+CHROME_DEBUGGER_ADDRESS = os.getenv("CHROME_DEBUGGER_ADDRESS", "localhost:9222")
+MESSAGING_NAMESPACE = "/messaging"  # The backend serves every tenant here and routes by USER_ID
 POLL_INTERVAL = 5  # Seconds between polling requests
+WIRE_FORMAT = os.getenv("WIRE_FORMAT", WIRE_FORMAT_JSON)  # "msgpack" to negotiate the binary wire format
+RECORD_TRAFFIC_FILE = os.getenv("RECORD_TRAFFIC_FILE")  # Append every emitted event here as JSON lines
+SOCKETIO_DEBUG_LOGS = os.getenv("SOCKETIO_DEBUG_LOGS", "0") == "1"  # Verbose Socket.IO/Engine.IO packet logs
+DIGEST_WINDOW_SIZE = int(os.getenv("DIGEST_WINDOW_SIZE", "200"))  # Messages tracked per chat for edit/delete detection
+CONTEXT_WINDOW_SIZE = int(os.getenv("CONTEXT_WINDOW_SIZE", "20"))  # Recent messages per chat attached to outbound messages
+CATCH_UP_MAX_SCROLLS = int(os.getenv("CATCH_UP_MAX_SCROLLS", "10"))  # Upper bound on scroll steps when recovering a gap
+CATCH_UP_SCROLL_PAUSE = 0.3  # Seconds to let the virtual list render after each scroll step
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")  # Where on-demand profiles are written
+PROFILE_DURATION = float(os.getenv("PROFILE_DURATION", "30"))  # Seconds sampled per SIGUSR1
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))  # Seconds between stack samples
+FAST_START = os.getenv("FAST_START", "0") == "1"  # Connect and attach concurrently, restore STATE_FILE, skip the workspace prompts
+STATE_FILE = os.getenv("STATE_FILE", "client_state.json")  # Selected conversation and cursors, saved while polling
+NAVIGATION_TIMEOUT = 10  # Seconds to wait for a conversation to become ready after switching
+ATTACH_WAIT_TIMEOUT = 60  # Seconds a conversation selection waits for the driver to attach at startup
+THREAD_TRACKING = os.getenv("THREAD_TRACKING", "1") == "1"  # Follow replies in every thread of the monitored chat
+THREAD_SCAN_LIMIT = int(os.getenv("THREAD_SCAN_LIMIT", "3"))  # Threads opened per poll cycle; the rest wait for later cycles
+WATCHDOG_INTERVAL = 5  # Seconds between driver and socket health checks
+DRIVER_PROBE_TIMEOUT = 5  # Seconds a driver health probe may take before the session counts as wedged
+POLL_STALL_DEADLINE = float(os.getenv("POLL_STALL_DEADLINE", "60"))  # Seconds without a poll cycle (and the driver free) before rebuilding it
+DRIVER_CALL_DEADLINE = float(os.getenv("DRIVER_CALL_DEADLINE", "30"))  # Seconds one WebDriver command (a script, a find, a click) may run before the session counts as wedged
+SOCKET_RECOVERY_DEADLINE = float(os.getenv("SOCKET_RECOVERY_DEADLINE", "15"))  # Seconds disconnected before forcing a reconnect
+CHROME_LAUNCH_COMMAND = os.getenv("CHROME_LAUNCH_COMMAND")  # Relaunches Chrome if the debug port is gone
+CHROME_RELAUNCH_COOLDOWN = 30  # Seconds to wait for a relaunched Chrome before launching another
+
+# Sidebar data-qa-channel-sidebar-channel-type values and the conversation types they map to
+SIDEBAR_TYPES = {
+    'channel': 'channel',
+    'im': 'dm',
+    'private': 'private',
+    'mpim': 'group',
+}
+
+# Messages in the main pane and in the open thread pane
+MAIN_MESSAGE_SELECTOR = "div.c-message_kit__background"
+THREAD_PANE_SELECTOR = "div.p-threads_view"
+THREAD_MESSAGE_SELECTOR = "div.c-virtual_list__item--thread div.c-message_kit__background"
+
+# Selectors tried in order when looking for a message's sender
+SENDER_SELECTORS = [
+    "a.c-message__sender_link",
+    "button.c-message__sender_button",
+    "span.c-message__sender",
+    "span.offscreen[data-qa^='aria-labelledby']",
+]
 
 # Initialize Socket.IO client with explicit configuration
 sio = Client(
-    logger=True,
-    engineio_logger=True,
+    logger=SOCKETIO_DEBUG_LOGS,
+    engineio_logger=SOCKETIO_DEBUG_LOGS,
     reconnection=True,
     reconnection_attempts=5,
     reconnection_delay=1000,
@@ -46,6 +99,12 @@ sio = Client(
 # Flag to control the main loop
 running = True
 
+# Selenium's webdriver package is slow to import, so it is loaded when the driver is first attached (see load_selenium)
+webdriver = Options = By = Keys = ActionChains = WebDriverWait = EC = None
+
+# The WebDriver session; None until attach_driver (or recover_driver) attaches one
+driver = None
+
 # Initialize variables to track workspace state
 previous_workspace_name = None
 previous_workspace_data = None
@@ -53,6 +112,60 @@ previous_workspace_data = None
 # Add a global variable to track the currently selected conversation
 selected_conversation = None
 
+# Every conversation seen in the sidebar, by channel id; kept after entries scroll out of view
+conversation_index = {}
+
+# Slack member ids of 'me' (one per workspace), resolved once after attaching to Chrome
+self_member_ids = set()
+
+# Per-chat index of message_id -> content digest, used to detect edits and deletions
+message_digest_index = {}
+
+# Per-chat rolling window of recent normalized messages (including 'me'), oldest first
+chat_context = {}
+
+# Per-chat thread cursors: parent ts -> reply count, last-reply label and newest reply ts seen
+thread_cursors = {}
+
+# Outbound replies waiting to be typed into Slack, queued per chat in arrival order
+outbound_queues = OrderedDict()
+outbound_condition = threading.Condition()
+
+# Set once the backend accepts the binary wire format; reset on every new connection
+wire_encoder = None
+wire_lock = threading.Lock()
+
+# Serializes WebDriver access between the poll loop, socket handlers and the sender thread
+driver_lock = threading.RLock()
+
+# Monotonic time of the poll loop's latest cycle, watched for stalls
+last_poll_cycle_at = time.monotonic()
+
+# Thread id -> monotonic start of the WebDriver command that thread is waiting on
+driver_calls_in_flight = {}
+
+# Poll cycle counter and the chat being polled, used to annotate profiles
+poll_cycle_id = 0
+monitored_chat_id = None
+
+# Started on demand via SIGUSR1 or the startProfiler event
+profiler = SamplingProfiler(interval=PROFILE_SAMPLE_INTERVAL)
+
+# Latest value of each reported metric
+metrics = {}
+
+# Monotonic time Chrome was last relaunched by the watchdog
+chrome_relaunched_at = None
+
+# Set once a conversation is selected, so the poll loop starts without waiting out POLL_INTERVAL
+conversation_selected = threading.Event()
+
+# Set once a driver is attached; with FAST_START a selection can arrive before that
+driver_attached = threading.Event()
+
+# Last state written to STATE_FILE, to skip unchanged writes
+saved_client_state = None
+
 def signal_handler(sig, frame):
     global running
     logger.info("Shutting down messaging client...")
@@ -64,26 +177,147 @@ def signal_handler(sig, frame):
         pass
     sys.exit(0)
 
+def hot_path_logging_signal_handler(sig, frame):
+    enabled = toggle_hot_path_logging()
+    logger.info("Hot-path logging %s", "enabled" if enabled else "disabled")
+
+def profile_annotations():
+    return [f"chat={monitored_chat_id}", f"cycle={poll_cycle_id}"]
+
+def start_profiling(duration):
+    """Starts sampling all threads for duration seconds; the profile is written under PROFILE_DIR."""
+    output_path = os.path.join(PROFILE_DIR, f"profile-{int(time.time())}-{os.getpid()}.collapsed")
+    if profiler.start(duration, output_path, annotate=profile_annotations):
+        logger.info("Profiling for %ss; collapsed stacks will be written to %s", duration, output_path)
+    else:
+        logger.warning("A profile is already being recorded.")
+
+def profiler_signal_handler(sig, frame):
+    start_profiling(PROFILE_DURATION)
+
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
+# SIGUSR1 and SIGUSR2 do not exist on Windows
+if hasattr(signal, "SIGUSR1"):
+    signal.signal(signal.SIGUSR1, profiler_signal_handler)
+    signal.signal(signal.SIGUSR2, hot_path_logging_signal_handler)
 
-@sio.event(namespace="/messaging")
+@sio.event(namespace=MESSAGING_NAMESPACE)
 def connect():
     logger.info("Connected to WebSocket server.")
+    if "time_to_connected" not in metrics:
+        report_metric("time_to_connected", time.monotonic() - started_at)
+    negotiate_wire_format()
 
-@sio.event(namespace="/messaging")
+@sio.event(namespace=MESSAGING_NAMESPACE)
 def connect_error(data):
-    logger.error("Connection failed:", data)
+    logger.error("Connection failed: %s", data)
 
-@sio.event(namespace="/messaging")
+@sio.event(namespace=MESSAGING_NAMESPACE)
 def disconnect():
     logger.info("Disconnected from WebSocket server.")
 
+def negotiate_wire_format():
+    """
+    Offers the binary wire format to the backend. Backends that don't know the
+    'wireCapabilities' event never answer, so the client keeps sending JSON.
+    """
+    global wire_encoder
+    with wire_lock:
+        # Interned tables are per connection, so start over as JSON
+        wire_encoder = None
+
+    if WIRE_FORMAT != WIRE_FORMAT_MSGPACK:
+        return
+    if msgpack is None:
+        logger.warning("WIRE_FORMAT=msgpack but msgpack is not installed; using JSON.")
+        return
+
+    sio.emit(
+        "wireCapabilities",
+        {"formats": [WIRE_FORMAT_MSGPACK], "compression": ["zlib"]},
+        namespace=MESSAGING_NAMESPACE,
+        callback=on_wire_format_accepted,
+    )
+
+def on_wire_format_accepted(reply):
+    global wire_encoder
+    if isinstance(reply, dict) and reply.get("format") == WIRE_FORMAT_MSGPACK:
+        with wire_lock:
+            wire_encoder = WireEncoder(compression="zlib" in (reply.get("compression") or []))
+        logger.info("Backend accepted the msgpack wire format.")
+
+def record_traffic(event, data):
+    """Appends an emitted event to RECORD_TRAFFIC_FILE for offline wire-format comparisons."""
+    try:
+        with open(RECORD_TRAFFIC_FILE, "a") as traffic_file:
+            traffic_file.write(json.dumps({"event": event, "data": data}) + "\n")
+    except Exception:
+        logger.exception("Failed to record traffic.")
+
+def emit_event(event, data):
+    """
+    Emits an event to the backend's /messaging namespace, packed with the
+    negotiated wire format when there is one.
+    """
+    if RECORD_TRAFFIC_FILE:
+        record_traffic(event, data)
+
+    with wire_lock:
+        if wire_encoder is not None:
+            sio.emit(PACKED_EVENT, wire_encoder.encode(event, data), namespace=MESSAGING_NAMESPACE)
+            return
+    sio.emit(event, data, namespace=MESSAGING_NAMESPACE)
+
+def report_metric(name, value, **labels):
+    """Records a metric and logs it as a structured line."""
+    metrics[name] = value
+    logger.info("Metric %s=%.3f", name, value, extra={"metric": name, "value": value, **labels})
+
+def load_selenium():
+    """Imports Selenium's webdriver modules into module globals on first use."""
+    global webdriver, Options, By, Keys, ActionChains, WebDriverWait, EC
+    if webdriver is not None:
+        return
+
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys  # For simulating key presses
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium import webdriver
+
 def initialize_selenium():
+    load_selenium()
     chrome_options = Options()
-    chrome_options.add_experimental_option("debuggerAddress", "localhost:9222")
+    chrome_options.add_experimental_option("debuggerAddress", CHROME_DEBUGGER_ADDRESS)
     driver = webdriver.Chrome(options=chrome_options)
-    return driver
+    return track_driver_calls(driver)
+
+def track_driver_calls(new_driver):
+    """
+    Records when each WebDriver command starts and ends, so the watchdog can
+    time the command itself rather than the work around it. Every command,
+    element ones included, goes through the driver's execute.
+    """
+    execute = new_driver.execute
+
+    def timed_execute(driver_command, params=None):
+        thread_id = threading.get_ident()
+        driver_calls_in_flight[thread_id] = time.monotonic()
+        try:
+            return execute(driver_command, params)
+        finally:
+            driver_calls_in_flight.pop(thread_id, None)
+
+    new_driver.execute = timed_execute
+    return new_driver
+
+def oldest_driver_call_age(now):
+    """Seconds the longest-running WebDriver command has been waiting, or None if none is."""
+    started = list(driver_calls_in_flight.values())
+    return now - min(started) if started else None
 
 def is_dm(driver):
     """
@@ -107,7 +341,7 @@ def is_thread_open(driver):
     """
     try:
         # Adjust the selector based on Slack's current HTML structure
-        thread_pane = driver.find_element(By.CSS_SELECTOR, 'div.p-threads_view')
+        thread_pane = driver.find_element(By.CSS_SELECTOR, THREAD_PANE_SELECTOR)
         if thread_pane.is_displayed():
             return True
         else:
@@ -133,31 +367,6 @@ def hash_sender_name(sender_name, salt, pepper):
     hasher.update(sender_name.encode('utf-8') + salt + pepper.encode('utf-8'))
     return hasher.hexdigest()
 
-def extract_sender_name(message):
-    sender_name = "Unknown"
-
-    possible_selectors = [
-        "a.c-message__sender_link",
-        "button.c-message__sender_button",
-        "span.c-message__sender",
-        "span.offscreen[data-qa^='aria-labelledby']",
-    ]
-
-    for selector in possible_selectors:
-        try:
-            sender_element = message.find_element(By.CSS_SELECTOR, selector)
-            sender_name = sender_element.text.strip()
-            break
-        except NoSuchElementException:
-            continue
-
-    sender_name = normalize_sender_name(sender_name)
-
-    if sender_name == "Unknown":
-        logger.warning("Could not extract sender name for a message.")
-
-    return sender_name
-
 def normalize_sender_name(sender_name):
     # Remove leading/trailing whitespace
     sender_name = sender_name.strip()
@@ -174,13 +383,12 @@ def normalize_sender_name(sender_name):
     return sender_name
 
 
-def extract_message_text(message):
-    try:
-        message_text_element = message.find_element(By.CSS_SELECTOR, "div.c-message_kit__blocks")
-        message_text = message_text_element.text.strip()
-    except NoSuchElementException:
-        message_text = ""
-    return message_text
+def is_self_sender(sender_name):
+    """
+    Returns True if a normalized sender name is exactly SELF_NAME. A substring
+    match would take e.g. 'pearlman' for 'pearl' and drop their messages as mine.
+    """
+    return sender_name == normalize_sender_name(SELF_NAME)
 
 def extract_timestamp(message_id):
     try:
@@ -197,97 +405,680 @@ def hash_sender_name_with_salt(sender_name):
     hashed_sender_name = hash_sender_name(sender_name, salt, PEPPER)
     return hashed_sender_name
 
-def find_last_message_from_me(driver):
+# Collects ts, text, sender member id and sender name for every rendered message in a single round trip.
+# Consecutive messages from one sender carry no sender element, so they inherit the previous sender id.
+# Sender names are only read for messages not sent by 'me' (arguments[2] holds my member ids).
+# Nodes inside arguments[3], if given, are skipped.
+SCAN_MESSAGES_SCRIPT = """
+const records = [];
+let previousSenderId = null;
+for (const node of document.querySelectorAll(arguments[0])) {
+    if (arguments[3] && node.closest(arguments[3])) {
+        continue;
+    }
+    const tsEl = node.querySelector('a.c-timestamp');
+    const textEl = node.querySelector('div.c-message_kit__blocks');
+    const senderIdEl = node.querySelector('[data-message-sender]');
+    const senderId = senderIdEl ? senderIdEl.getAttribute('data-message-sender') : previousSenderId;
+    previousSenderId = senderId;
+    const fromMe = senderId !== null && arguments[2].includes(senderId);
+    let sender = null;
+    if (!fromMe) {
+        for (const selector of arguments[1]) {
+            const senderEl = node.querySelector(selector);
+            if (senderEl) {
+                sender = senderEl.innerText;
+                break;
+            }
+        }
+    }
+    records.push({
+        ts: tsEl ? tsEl.getAttribute('data-ts') : null,
+        text: textEl ? textEl.innerText.trim() : '',
+        sender: sender,
+        sender_id: senderId,
+        from_me: fromMe,
+    });
+}
+return records;
+"""
+
+# Reads the signed-in member id of every workspace from the Slack web client's local config
+SELF_MEMBER_IDS_SCRIPT = """
+const ids = [];
+try {
+    const config = JSON.parse(localStorage.getItem('localConfig_v2') || '{}');
+    for (const team of Object.values(config.teams || {})) {
+        if (team.user_id) {
+            ids.push(team.user_id);
+        }
+    }
+} catch (e) {}
+return ids;
+"""
+
+def resolve_self_member_ids(driver):
     """
-    Finds the last message sent by 'me' (pearl) in Slack.
-    Returns:
-        last_message_from_me_ts_float: The timestamp (as float) of the last message sent by 'me'.
+    Resolves the Slack member ids of 'me' once: from SELF_MEMBER_IDS if set,
+    else from the Slack web client's local config. If neither yields an id,
+    the first scan that finds a sender named exactly SELF_NAME learns it instead.
     """
+    global self_member_ids
+
+    ids = {member_id.strip() for member_id in SELF_MEMBER_IDS.split(",") if member_id.strip()}
+    if not ids:
+        try:
+            ids = set(driver.execute_script(SELF_MEMBER_IDS_SCRIPT) or [])
+        except Exception as e:
+            logger.exception("Error reading own member ids from Slack.")
+
+    self_member_ids = ids
+    if ids:
+        logger.info(f"Identified own Slack member id(s): {', '.join(sorted(ids))}")
+    else:
+        logger.error(
+            f"Could not identify own Slack member id and SELF_MEMBER_IDS is unset; treating only senders named "
+            f"exactly '{SELF_NAME}' as me until one is seen. Set SELF_MEMBER_IDS to be sure."
+        )
+
+def scan_message_records(driver, selector):
+    """
+    Bulk-scans all rendered messages matching selector.
+    Returns a list of dicts with 'ts', 'text', 'sender_id', 'from_me' and
+    normalized 'sender_name'. Messages from 'me' are identified by member id
+    and get SELF_NAME as their sender name without reading it. Main-pane
+    scans skip the thread pane, whose messages match the same selector.
+    """
+    global self_member_ids
+
+    exclude = THREAD_PANE_SELECTOR if selector == MAIN_MESSAGE_SELECTOR else None
     try:
-        # Locate message elements
-        messages = driver.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background")
+        records = driver.execute_script(
+            SCAN_MESSAGES_SCRIPT, selector, SENDER_SELECTORS, sorted(self_member_ids), exclude
+        ) or []
+    except Exception as e:
+        logger.exception("Error bulk-scanning messages.")
+        return []
 
-        # Go through messages from newest to oldest
-        for message in reversed(messages):
-            logger.info(f"Message: {extract_message_text(message)}")
-            # Extract sender name
-            sender_name = extract_sender_name(message)
-            logger.info(f"Sender name: {sender_name}")
-            # Check if the sender is 'me'
-            if "pearl" in sender_name.lower():
-                # Extract message ID (timestamp)
-                try:
-                    timestamp_element = message.find_element(By.CSS_SELECTOR, "a.c-timestamp")
-                    message_id = timestamp_element.get_attribute("data-ts")
-                    message_ts_float = float(message_id)
-                except (NoSuchElementException, ValueError):
-                    message_id = None
-                    message_ts_float = None
-
-                logger.info(f"Found last message from 'me' with ID: {message_id}")
-                return message_ts_float
-
-        # If no message from 'me' is found
-        logger.info("No previous message from 'me' found.")
+    if not self_member_ids:
+        # Fall back to the sender name; a sender named exactly SELF_NAME also teaches the member id
+        exact_ids = set()
+        for record in records:
+            record['sender_name'] = normalize_sender_name(record.get('sender') or "Unknown")
+            record['from_me'] = is_self_sender(record['sender_name'])
+            if record['from_me'] and record['sender_id']:
+                exact_ids.add(record['sender_id'])
+
+        if len(exact_ids) == 1:
+            self_member_ids = exact_ids
+            logger.warning(
+                f"Learned own Slack member id {next(iter(exact_ids))} from a sender named '{SELF_NAME}'; "
+                "set SELF_MEMBER_IDS if this is not you."
+            )
+        elif exact_ids:
+            logger.warning(
+                f"Several members are named '{SELF_NAME}' ({', '.join(sorted(exact_ids))}); "
+                "not learning an id. Set SELF_MEMBER_IDS."
+            )
+        return records
+
+    for record in records:
+        record['sender_name'] = SELF_NAME if record['from_me'] else normalize_sender_name(record.get('sender') or "Unknown")
+    return records
+
+def compute_content_digest(text):
+    """
+    Returns a short digest of a message's content.
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+def update_message_digest_index(chat_id, records):
+    """
+    Refreshes the digest index for chat_id from a bulk scan.
+    Returns (edited, deleted): records whose digest changed, and message ids that
+    disappeared from within the rendered ts range.
+    """
+    index = message_digest_index.setdefault(chat_id, OrderedDict())
+
+    rendered = {}
+    for record in records:
+        try:
+            float(record['ts'])
+        except (TypeError, ValueError):
+            continue
+        rendered[record['ts']] = record
+
+    if not rendered:
+        return [], []
+
+    edited = []
+    for message_id, record in rendered.items():
+        digest = compute_content_digest(record['text'])
+        previous_digest = index.get(message_id)
+        if previous_digest is not None and previous_digest != digest:
+            edited.append(record)
+        index[message_id] = digest
+
+    # Only ids inside the rendered range can be judged; older ones may just be virtualized away
+    oldest_ts = min(float(ts) for ts in rendered)
+    newest_ts = max(float(ts) for ts in rendered)
+    deleted = [
+        message_id for message_id in index
+        if message_id not in rendered and oldest_ts <= float(message_id) <= newest_ts
+    ]
+    for message_id in deleted:
+        del index[message_id]
+
+    # Keep only the newest DIGEST_WINDOW_SIZE entries
+    if len(index) > DIGEST_WINDOW_SIZE:
+        keep = sorted(index, key=float)[-DIGEST_WINDOW_SIZE:]
+        message_digest_index[chat_id] = OrderedDict((message_id, index[message_id]) for message_id in keep)
+
+    return edited, deleted
+
+def current_message_selector(driver):
+    """
+    Returns the selector for messages in the thread pane if one is open, else the main pane.
+    """
+    if is_thread_open(driver):
+        return THREAD_MESSAGE_SELECTOR
+    return MAIN_MESSAGE_SELECTOR
+
+def thread_context_key(chat_id, thread_ts):
+    """Key for per-thread state (context window, cursor) alongside per-chat state."""
+    return f"{chat_id}:{thread_ts}"
+
+def scan_open_panes(driver):
+    """
+    Bulk-scans the main pane and, if a thread is open, the thread pane.
+    Returns (main_records, thread_ts, thread_records); thread_ts and
+    thread_records are None when no thread is open. The thread's parent is
+    the first message rendered in the thread pane.
+    """
+    main_records = scan_message_records(driver, MAIN_MESSAGE_SELECTOR)
+    if not is_thread_open(driver):
+        return main_records, None, None
+
+    thread_records = scan_message_records(driver, THREAD_MESSAGE_SELECTOR)
+    thread_ts = next((record['ts'] for record in thread_records if record['ts']), None)
+    if thread_ts is None:
+        return main_records, None, None
+    return main_records, thread_ts, thread_records
+
+def detect_edits_and_deletions(chat_id, records):
+    """
+    Emits 'messageEdited' / 'messageDeleted' events for scanned messages whose
+    content digest changed or which were removed.
+    """
+    if chat_id is None:
+        return
+
+    edited, deleted = update_message_digest_index(chat_id, records)
+
+    for record in edited:
+        # Skip edits of messages sent by 'me' to prevent feedback loops
+        if record['from_me']:
+            continue
+        notify_message_edited(chat_id, record)
+
+    for message_id in deleted:
+        notify_message_deleted(chat_id, message_id)
+
+# Scrolls the pane holding the first matching message up by most of a screen, or to the bottom.
+# Returns the new scrollTop, or null if no scrollable pane was found.
+SCROLL_MESSAGES_SCRIPT = """
+const first = document.querySelector(arguments[0]);
+let pane = first ? first.parentElement : null;
+while (pane && !(pane.scrollHeight > pane.clientHeight && /(auto|scroll)/.test(getComputedStyle(pane).overflowY))) {
+    pane = pane.parentElement;
+}
+if (!pane) {
+    return null;
+}
+if (arguments[1] === 'bottom') {
+    pane.scrollTop = pane.scrollHeight;
+} else {
+    pane.scrollTop = Math.max(0, pane.scrollTop - pane.clientHeight * 0.8);
+}
+return pane.scrollTop;
+"""
+
+def has_rendered_gap(records, cursor):
+    """
+    Returns True if messages between the cursor and the oldest rendered message
+    may have been virtualized away: the cursor itself is not rendered and
+    everything rendered is newer than it.
+    """
+    if cursor is None:
+        return False
+    try:
+        cursor_ts = float(cursor)
+    except (TypeError, ValueError):
+        return False
+
+    rendered = []
+    for record in records:
+        try:
+            rendered.append(float(record['ts']))
+        except (TypeError, ValueError):
+            continue
+    if not rendered or cursor_ts in rendered:
+        return False
+    return min(rendered) > cursor_ts
+
+def count_records_after(records, cursor):
+    """Returns how many records are newer than the cursor."""
+    cursor_ts = float(cursor)
+    count = 0
+    for record in records:
+        try:
+            count += float(record['ts']) > cursor_ts
+        except (TypeError, ValueError):
+            continue
+    return count
+
+def catch_up_missing_messages(driver, selector, cursor, records):
+    """
+    Scrolls up through the message pane until the cursor is rendered (or
+    CATCH_UP_MAX_SCROLLS is reached), collecting every message seen, then
+    scrolls back to the bottom. Returns the merged records, oldest first.
+    """
+    cursor_ts = float(cursor)
+    collected = {record['ts']: record for record in records if record['ts']}
+    reached_cursor = False
+
+    try:
+        for _ in range(CATCH_UP_MAX_SCROLLS):
+            scroll_top = driver.execute_script(SCROLL_MESSAGES_SCRIPT, selector, 'up')
+            if scroll_top is None:
+                break
+            time.sleep(CATCH_UP_SCROLL_PAUSE)
+
+            for record in scan_message_records(driver, selector):
+                if record['ts']:
+                    collected.setdefault(record['ts'], record)
+                    try:
+                        reached_cursor = reached_cursor or float(record['ts']) <= cursor_ts
+                    except ValueError:
+                        pass
+
+            if reached_cursor or scroll_top == 0:
+                break
+    finally:
+        driver.execute_script(SCROLL_MESSAGES_SCRIPT, selector, 'bottom')
+
+    if not reached_cursor:
+        logger.warning("Catch-up stopped before reaching message %s; some messages may be missing.", cursor)
+
+    merged = sorted(collected.values(), key=lambda record: float(record['ts']))
+    report_metric("catch_up_messages", len(merged) - len(records), reached_cursor=reached_cursor)
+    return merged
+
+def update_chat_context(chat_id, records, size=CONTEXT_WINDOW_SIZE):
+    """
+    Merges bulk-scanned records into the chat's rolling context window,
+    including messages sent by 'me'. Known messages get their content refreshed.
+    size bounds the window; after a catch-up it is widened to the recovered range.
+    """
+    if chat_id is None:
+        return
+
+    window = chat_context.setdefault(chat_id, deque(maxlen=size))
+    known = {message['message_id']: message for message in window}
+    added = []
+    previous_sender = "unknown"
+
+    for record in records:
+        message_id = record['ts']
+        try:
+            float(message_id)
+        except (TypeError, ValueError):
+            continue
+
+        # Consecutive messages from the same sender are rendered without a sender name
+        sender_name = record['sender_name']
+        if sender_name == "unknown":
+            sender_name = previous_sender
+        previous_sender = sender_name
+
+        if message_id in known:
+            known[message_id]['content'] = record['text']
+            continue
+
+        # Without a known member id, continuation messages are matched by their inherited name
+        from_me = record['from_me'] if self_member_ids else is_self_sender(sender_name)
+        added.append({
+            'message_id': message_id,
+            'timestamp': extract_timestamp(message_id),
+            'content': record['text'],
+            'from_me': from_me,
+            'hashed_sender_name': None if from_me else hash_sender_name_with_salt(sender_name),
+        })
+
+    if added or window.maxlen != size:
+        merged = sorted(list(window) + added, key=lambda message: float(message['message_id']))
+        chat_context[chat_id] = deque(merged, maxlen=size)
+
+def encode_context_window(chat_id):
+    """
+    Returns the chat's context window in a compact, delta-encoded form:
+    timestamps as deltas from the previous message, senders as indexes into a
+    per-window sender table (-1 for 'me').
+    """
+    window = chat_context.get(chat_id)
+    if not window:
         return None
 
+    senders = []
+    rows = []
+    base_timestamp = previous_timestamp = window[0]['timestamp']
+    for message in window:
+        if message['from_me']:
+            sender_index = -1
+        else:
+            if message['hashed_sender_name'] not in senders:
+                senders.append(message['hashed_sender_name'])
+            sender_index = senders.index(message['hashed_sender_name'])
+        rows.append([message['timestamp'] - previous_timestamp, sender_index, message['content']])
+        previous_timestamp = message['timestamp']
+
+    return {
+        'base_timestamp': base_timestamp,
+        'senders': senders,
+        'messages': rows,
+    }
+
+# Reads the reply-count indicator of every rendered parent message in the main pane in one round trip
+SCAN_THREAD_INDICATORS_SCRIPT = """
+const indicators = [];
+for (const node of document.querySelectorAll('div.c-message_kit__background')) {
+    if (node.closest('div.c-virtual_list__item--thread')) {
+        continue;
+    }
+    const bar = node.querySelector('div.c-message__reply_bar');
+    const tsEl = node.querySelector('a.c-timestamp');
+    if (!bar || !tsEl) {
+        continue;
+    }
+    const countEl = bar.querySelector('.c-message__reply_count') || bar;
+    const count = (countEl.innerText.match(/\\d+/) || ['0'])[0];
+    indicators.push({ts: tsEl.getAttribute('data-ts'), reply_count: parseInt(count, 10)});
+}
+return indicators;
+"""
+
+# Clicks the reply-count indicator of the parent message with the given ts. Returns false if it is not rendered.
+OPEN_THREAD_SCRIPT = """
+const tsEl = document.querySelector('div.c-message_kit__background a.c-timestamp[data-ts="' + arguments[0] + '"]');
+const node = tsEl ? tsEl.closest('div.c-message_kit__background') : null;
+const bar = node ? node.querySelector('div.c-message__reply_bar .c-message__reply_count') || node.querySelector('div.c-message__reply_bar') : null;
+if (!bar) {
+    return false;
+}
+bar.click();
+return true;
+"""
+
+def scan_thread_indicators(driver):
+    """
+    Bulk-scans reply-count indicators in the main pane.
+    Returns a list of dicts with the parent message's 'ts' and its 'reply_count'.
+    """
+    try:
+        return driver.execute_script(SCAN_THREAD_INDICATORS_SCRIPT) or []
     except Exception as e:
-        logger.exception("Error finding last message from 'me'.")
+        logger.exception("Error scanning thread indicators.")
+        return []
+
+def find_grown_threads(chat_id, indicators):
+    """
+    Compares indicators with the chat's thread cursors and returns
+    (indicator, cursor) pairs for threads whose reply count increased, newest
+    parent first. Threads seen for the first time only get a baseline cursor.
+    """
+    cursors = thread_cursors.setdefault(chat_id, {})
+    grown = []
+
+    for indicator in indicators:
+        parent_ts = indicator.get('ts')
+        try:
+            float(parent_ts)
+        except (TypeError, ValueError):
+            continue
+
+        cursor = cursors.get(parent_ts)
+        if cursor is None:
+            cursors[parent_ts] = {'reply_count': indicator['reply_count'], 'last_reply_ts': None}
+        elif indicator['reply_count'] > cursor['reply_count']:
+            grown.append((indicator, cursor))
+        elif indicator['reply_count'] < cursor['reply_count']:
+            # Replies were deleted; lower the baseline so the next reply counts as growth
+            cursor['reply_count'] = indicator['reply_count']
+
+    # Keep cursors only for the newest DIGEST_WINDOW_SIZE parents
+    if len(cursors) > DIGEST_WINDOW_SIZE:
+        keep = sorted(cursors, key=float)[-DIGEST_WINDOW_SIZE:]
+        for parent_ts in set(cursors) - set(keep):
+            chat_context.pop(f"{chat_id}:{parent_ts}", None)
+        thread_cursors[chat_id] = {parent_ts: cursors[parent_ts] for parent_ts in keep}
+
+    grown.sort(key=lambda pair: float(pair[0]['ts']), reverse=True)
+    return grown
+
+def open_thread(driver, parent_ts):
+    """
+    Opens the thread of a rendered parent message and waits for its replies
+    to render. Returns False if the thread could not be opened in time.
+    """
+    if not driver.execute_script(OPEN_THREAD_SCRIPT, parent_ts):
+        return False
+
+    def thread_ready(d):
+        return is_thread_open(d) and bool(d.find_elements(By.CSS_SELECTOR, current_message_selector(d)))
+
+    try:
+        WebDriverWait(driver, NAVIGATION_TIMEOUT, poll_frequency=0.1).until(thread_ready)
+        return True
+    except TimeoutException:
+        return False
+
+def close_thread(driver):
+    """
+    Closes the thread pane and waits for it to disappear.
+    """
+    close_buttons = driver.find_elements(By.CSS_SELECTOR, 'div.p-threads_view button[data-qa="close_flexpane"]')
+    if close_buttons:
+        driver.execute_script("arguments[0].click();", close_buttons[0])
+    else:
+        ActionChains(driver).send_keys(Keys.ESCAPE).perform()
+
+    try:
+        WebDriverWait(driver, NAVIGATION_TIMEOUT, poll_frequency=0.1).until(lambda d: not is_thread_open(d))
+    except TimeoutException:
+        logger.warning("Thread pane did not close in time.")
+
+def open_thread_parent_ts(driver):
+    """
+    Returns the ts of the open thread's parent message, or None if no thread is open.
+    """
+    if not is_thread_open(driver):
         return None
+    thread_records = scan_message_records(driver, THREAD_MESSAGE_SELECTOR)
+    return next((record['ts'] for record in thread_records if record['ts']), None)
 
-def find_last_message_from_me_in_thread(driver):
+def show_thread(driver, thread_ts):
+    """
+    Makes the thread of thread_ts the open one, or closes any open thread if
+    thread_ts is None. Returns False if the thread could not be opened.
+    """
+    open_ts = open_thread_parent_ts(driver)
+    if open_ts == thread_ts:
+        return True
+    if open_ts is not None:
+        close_thread(driver)
+    return thread_ts is None or open_thread(driver, thread_ts)
+
+def scan_open_thread(driver, chat_id, parent_ts, cursor, grown_by):
     """
-    Finds the last message sent by 'me' (pearl) in the current thread.
+    Scans the open thread and sends the latest reply from others since the
+    cursor (and since 'me' last replied) to the backend, tagged with the
+    parent's ts. Advances the cursor's newest reply ts.
+    """
+    records = [
+        record for record in scan_message_records(driver, current_message_selector(driver))
+        if record['ts']
+    ]
+    records.sort(key=lambda record: float(record['ts']))
+
+    # Consecutive messages from the same sender are rendered without a sender name
+    previous_sender = "unknown"
+    for record in records:
+        if record['sender_name'] == "unknown":
+            record['sender_name'] = previous_sender
+        previous_sender = record['sender_name']
+
+    # Each thread keeps its own context window, seeded with the parent message
+    context_key = thread_context_key(chat_id, parent_ts)
+    update_chat_context(context_key, records)
+
+    replies = [record for record in records if record['ts'] != parent_ts]
+    if not replies:
+        return
+
+    if cursor['last_reply_ts'] is None:
+        # No reply seen yet in this thread; the indicator says how many are new
+        new_replies = replies[-grown_by:]
+    else:
+        new_replies = [record for record in replies if float(record['ts']) > float(cursor['last_reply_ts'])]
+    cursor['last_reply_ts'] = replies[-1]['ts']
+
+    # Replies up to and including 'me' answering have been handled already
+    for index in range(len(new_replies) - 1, -1, -1):
+        if new_replies[index]['from_me']:
+            new_replies = new_replies[index + 1:]
+            break
+
+    if new_replies:
+        latest_reply = new_replies[-1]
+        send_message_via_websocket(
+            latest_reply['text'],
+            extract_timestamp(latest_reply['ts']),
+            hash_sender_name_with_salt(latest_reply['sender_name']),
+            encode_context_window(context_key),
+            thread_ts=parent_ts,
+            chat_id=chat_id,
+        )
+        hot_logger.info("Sent latest reply in thread %s of chat %s to backend.", parent_ts, chat_id)
+
+def track_threads(driver, chat_id):
+    """
+    Follows replies across every thread of the chat: reads all reply-count
+    indicators in one pass and opens only threads whose count increased,
+    at most THREAD_SCAN_LIMIT per call. Threads left over keep their old
+    count and are picked up on later cycles.
+    """
+    grown = find_grown_threads(chat_id, scan_thread_indicators(driver))
+    scanned = 0
+
+    for indicator, cursor in grown[:THREAD_SCAN_LIMIT]:
+        parent_ts = indicator['ts']
+        try:
+            if not open_thread(driver, parent_ts):
+                logger.warning("Could not open thread %s in chat %s.", parent_ts, chat_id)
+                continue
+            scan_open_thread(driver, chat_id, parent_ts, cursor, indicator['reply_count'] - cursor['reply_count'])
+            cursor['reply_count'] = indicator['reply_count']
+            scanned += 1
+        except Exception as e:
+            logger.exception(f"Error scanning thread {parent_ts} in chat {chat_id}.")
+        finally:
+            if is_thread_open(driver):
+                close_thread(driver)
+
+    if grown:
+        report_metric("threads_scanned", scanned, chat_id=chat_id, pending=len(grown) - scanned)
+
+def find_last_self_message_ts(records):
+    """
+    Returns the timestamp (as float) of the newest record sent by 'me', or None.
+    """
+    for record in reversed(records):
+        if record['from_me']:
+            try:
+                return float(record['ts'])
+            except (TypeError, ValueError):
+                return None
+    return None
+
+def find_last_message_from_me(driver, records=None):
+    """
+    Finds the last message sent by 'me' in Slack.
+    records, if given, is a bulk scan of the main pane to reuse.
     Returns:
-        last_message_from_me_ts_float: The timestamp (as float) of the last message sent by 'me' in the thread.
+        last_message_from_me_ts_float: The timestamp (as float) of the last message sent by 'me'.
     """
     try:
-        # Locate message elements in the thread
-        messages = driver.find_elements(By.CSS_SELECTOR, "div.c-virtual_list__item--thread div.c-message_kit__background")
-
-        # Go through messages from newest to oldest
-        for message in reversed(messages):
-            # Extract sender name
-            sender_name = extract_sender_name(message)
+        if records is None:
+            records = scan_message_records(driver, MAIN_MESSAGE_SELECTOR)
+        message_ts_float = find_last_self_message_ts(records)
+        if message_ts_float is None:
+            hot_logger.info("No previous message from 'me' found.")
+        else:
+            hot_logger.info("Found last message from 'me' with ID: %s", message_ts_float)
+        return message_ts_float
 
-            # Check if the sender is 'me'
-            if "pearl" in sender_name.lower():
-                # Extract message ID (timestamp)
-                try:
-                    timestamp_element = message.find_element(By.CSS_SELECTOR, "a.c-timestamp")
-                    message_id = timestamp_element.get_attribute("data-ts")
-                    message_ts_float = float(message_id)
-                except (NoSuchElementException, ValueError):
-                    message_id = None
-                    message_ts_float = None
-
-                logger.info(f"Found last message from 'me' in thread with ID: {message_id}")
-                return message_ts_float
-
-        # If no message from 'me' is found in the thread
-        logger.info("No previous message from 'me' found in thread.")
+    except Exception as e:
+        logger.exception("Error finding last message from 'me'.")
         return None
 
+def find_last_message_from_me_in_thread(driver, records=None):
+    """
+    Finds the last message sent by 'me' in the current thread.
+    records, if given, is a bulk scan of the thread pane to reuse.
+    Returns:
+        last_message_from_me_ts_float: The timestamp (as float) of the last message sent by 'me' in the thread.
+    """
+    try:
+        if records is None:
+            records = scan_message_records(driver, THREAD_MESSAGE_SELECTOR)
+        message_ts_float = find_last_self_message_ts(records)
+        if message_ts_float is None:
+            hot_logger.info("No previous message from 'me' found in thread.")
+        else:
+            hot_logger.info("Found last message from 'me' in thread with ID: %s", message_ts_float)
+        return message_ts_float
+
     except Exception as e:
         logger.exception("Error finding last message from 'me' in thread.")
         return None
 
-def collect_messages_from_elements(messages, last_message_from_me_ts_float, last_message_from_me_ts_float_in_thread=None):
+def record_message_id(record):
+    """
+    Returns (message_id, message_ts_float) for a scanned record, falling back
+    to a UUID when the message has no timestamp.
+    """
+    try:
+        return record['ts'], float(record['ts'])
+    except (TypeError, ValueError):
+        return str(uuid.uuid4()), None
+
+def to_outbound_message(record, message_id):
+    return {
+        'message_id': message_id,
+        'content': record['text'],
+        'timestamp': extract_timestamp(message_id),
+        'hashed_sender_name': hash_sender_name_with_salt(record['sender_name']),
+    }
+
+def collect_messages_from_records(records, last_message_from_me_ts_float, last_message_from_me_ts_float_in_thread=None):
     """
     Collect messages sent after the last message from 'me' (or up to last message from 'me' in thread), based on timestamps.
     """
     messages_list = []
 
     # Go through messages from oldest to newest
-    for message in messages:
-        # Extract message ID (timestamp)
-        try:
-            timestamp_element = message.find_element(By.CSS_SELECTOR, "a.c-timestamp")
-            message_id = timestamp_element.get_attribute("data-ts")
-            message_ts_float = float(message_id)
-        except (NoSuchElementException, ValueError):
-            message_id = str(uuid.uuid4())  # Fallback to UUID if timestamp not found
-            message_ts_float = None
+    for record in records:
+        message_id, message_ts_float = record_message_id(record)
 
         # For threads, stop collecting if message_ts_float >= last_message_from_me_ts_float_in_thread
         if last_message_from_me_ts_float_in_thread is not None and message_ts_float is not None:
@@ -299,65 +1090,45 @@ def collect_messages_from_elements(messages, last_message_from_me_ts_float, last
             if message_ts_float <= last_message_from_me_ts_float:
                 continue
 
-        # Extract sender name
-        sender_name = extract_sender_name(message)
         # Skip messages sent by 'me' to prevent feedback loops
-        if "pearl" in sender_name.lower():
+        if record['from_me']:
             continue
-        # Extract message content
-        message_text = extract_message_text(message)
-        # Extract timestamp
-        timestamp = extract_timestamp(message_id)
-        # Hash the sender's name
-        hashed_sender_name = hash_sender_name_with_salt(sender_name)
-        # Add message to the list
-        messages_list.append({
-            'message_id': message_id,
-            'content': message_text,
-            'timestamp': timestamp,
-            'hashed_sender_name': hashed_sender_name,
-        })
+        messages_list.append(to_outbound_message(record, message_id))
 
     return messages_list
 
-def collect_messages_after(driver, last_message_from_me_ts_float):
+def collect_messages_after(driver, last_message_from_me_ts_float, records=None):
     """
     Collects messages based on the current context: DM, channel, or thread.
+    records, if given, is a bulk scan of the current context to reuse.
     """
     try:
         # Determine context
         in_dm = is_dm(driver)
         thread_open = is_thread_open(driver)
         messages_list = []
+        if records is None:
+            records = scan_message_records(driver, THREAD_MESSAGE_SELECTOR if thread_open else MAIN_MESSAGE_SELECTOR)
 
         if thread_open:
-            logger.info("Thread is open. Collecting messages in thread up to last message from 'me'.")
-            # Find the last message from 'me' in the thread
-            last_message_from_me_in_thread_ts_float = find_last_message_from_me_in_thread(driver)
-
-            # Collect messages in the thread
-            messages = driver.find_elements(By.CSS_SELECTOR, "div.c-virtual_list__item--thread div.c-message_kit__background")
-
+            hot_logger.info("Thread is open. Collecting messages in thread up to last message from 'me'.")
             # Use the timestamp of the last message from 'me' in the thread
-            messages_list = collect_messages_from_elements(messages, None, last_message_from_me_in_thread_ts_float)
+            last_message_from_me_in_thread_ts_float = find_last_message_from_me_in_thread(driver, records)
+            messages_list = collect_messages_from_records(records, None, last_message_from_me_in_thread_ts_float)
         elif in_dm:
             if last_message_from_me_ts_float is None:
-                logger.info("No previous message from 'me' found in DM. Not collecting any messages.")
+                hot_logger.info("No previous message from 'me' found in DM. Not collecting any messages.")
                 messages_list = []
             else:
-                logger.info("In a DM. Collecting messages sent after last message from 'me'.")
-                # Collect messages in the DM
-                messages = driver.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background")
-                messages_list = collect_messages_from_elements(messages, last_message_from_me_ts_float)
+                hot_logger.info("In a DM. Collecting messages sent after last message from 'me'.")
+                messages_list = collect_messages_from_records(records, last_message_from_me_ts_float)
         else:
             if last_message_from_me_ts_float is None:
-                logger.info("No previous message from 'me' found in channel. Not collecting any messages.")
+                hot_logger.info("No previous message from 'me' found in channel. Not collecting any messages.")
                 messages_list = []
             else:
-                logger.info("In a channel. Collecting messages sent after last message from 'me'.")
-                # Collect messages in the channel
-                messages = driver.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background")
-                messages_list = collect_messages_from_elements(messages, last_message_from_me_ts_float)
+                hot_logger.info("In a channel. Collecting messages sent after last message from 'me'.")
+                messages_list = collect_messages_from_records(records, last_message_from_me_ts_float)
 
         return messages_list
 
@@ -365,44 +1136,38 @@ def collect_messages_after(driver, last_message_from_me_ts_float):
         logger.exception("Error collecting messages.")
         return []
 
-def detect_new_messages(driver, last_processed_ts_float):
+def detect_new_messages(driver, last_processed_ts_float, records=None):
     """
     Detects new messages based on the current context: DM, channel, or thread.
+    records, if given, is a bulk scan of the current context to reuse.
     """
     try:
         # Determine context
         in_dm = is_dm(driver)
         thread_open = is_thread_open(driver)
         new_messages = []
+        if records is None:
+            records = scan_message_records(driver, THREAD_MESSAGE_SELECTOR if thread_open else MAIN_MESSAGE_SELECTOR)
 
         if thread_open:
-            logger.info("Thread is open. Detecting new messages in thread up to last message from 'me'.")
-            # Find the last message from 'me' in the thread
-            last_message_from_me_in_thread_ts_float = find_last_message_from_me_in_thread(driver)
-
-            # Collect messages in the thread
-            messages = driver.find_elements(By.CSS_SELECTOR, "div.c-virtual_list__item--thread div.c-message_kit__background")
-
+            hot_logger.info("Thread is open. Detecting new messages in thread up to last message from 'me'.")
             # Use the timestamp of the last message from 'me' in the thread
-            new_messages = detect_new_messages_from_elements(messages, last_processed_ts_float, last_message_from_me_in_thread_ts_float)
+            last_message_from_me_in_thread_ts_float = find_last_message_from_me_in_thread(driver, records)
+            new_messages = detect_new_messages_from_records(records, last_processed_ts_float, last_message_from_me_in_thread_ts_float)
         elif in_dm:
             if last_processed_ts_float is None:
-                logger.info("No previous message from 'me' found in DM. Not detecting new messages.")
+                hot_logger.info("No previous message from 'me' found in DM. Not detecting new messages.")
                 new_messages = []
             else:
-                logger.info("In a DM. Detecting new messages.")
-                # Collect messages in the DM
-                messages = driver.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background")
-                new_messages = detect_new_messages_from_elements(messages, last_processed_ts_float)
+                hot_logger.info("In a DM. Detecting new messages.")
+                new_messages = detect_new_messages_from_records(records, last_processed_ts_float)
         else:
             if last_processed_ts_float is None:
-                logger.info("No previous message from 'me' found in channel. Not detecting new messages.")
+                hot_logger.info("No previous message from 'me' found in channel. Not detecting new messages.")
                 new_messages = []
             else:
-                logger.info("In a channel. Detecting new messages.")
-                # Collect messages in the channel
-                messages = driver.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background")
-                new_messages = detect_new_messages_from_elements(messages, last_processed_ts_float)
+                hot_logger.info("In a channel. Detecting new messages.")
+                new_messages = detect_new_messages_from_records(records, last_processed_ts_float)
 
         return new_messages
 
@@ -410,9 +1175,9 @@ def detect_new_messages(driver, last_processed_ts_float):
         logger.exception("Error detecting new messages.")
         return []
 
-def detect_new_messages_from_elements(messages, last_processed_ts_float, last_message_from_me_ts_float_in_thread=None):
+def detect_new_messages_from_records(records, last_processed_ts_float, last_message_from_me_ts_float_in_thread=None):
     """
-    Detects new messages from given message elements after last_processed_ts_float and before last_message_from_me_ts_float_in_thread.
+    Detects new messages from scanned records after last_processed_ts_float and before last_message_from_me_ts_float_in_thread.
     """
     new_messages = []
 
@@ -425,15 +1190,8 @@ def detect_new_messages_from_elements(messages, last_processed_ts_float, last_me
             last_processed_ts = None
 
     # Go through messages from oldest to newest
-    for message in messages:
-        # Extract message ID (timestamp)
-        try:
-            timestamp_element = message.find_element(By.CSS_SELECTOR, "a.c-timestamp")
-            message_id = timestamp_element.get_attribute("data-ts")
-            message_ts_float = float(message_id)
-        except (NoSuchElementException, ValueError):
-            message_id = str(uuid.uuid4())  # Fallback to UUID if timestamp not found
-            message_ts_float = None
+    for record in records:
+        message_id, message_ts_float = record_message_id(record)
 
         # For threads, stop collecting if message_ts_float >= last_message_from_me_ts_float_in_thread
         if last_message_from_me_ts_float_in_thread is not None and message_ts_float is not None:
@@ -449,59 +1207,107 @@ def detect_new_messages_from_elements(messages, last_processed_ts_float, last_me
             if message_ts_float <= last_processed_ts:
                 continue
 
-        # Extract sender name
-        sender_name = extract_sender_name(message)
         # Skip messages sent by 'me' to prevent feedback loops
-        if "pearl" in sender_name.lower():
+        if record['from_me']:
             continue
-        # Extract message content
-        message_text = extract_message_text(message)
-        # Extract timestamp
-        timestamp = extract_timestamp(message_id)
-        # Hash the sender's name
-        hashed_sender_name = hash_sender_name_with_salt(sender_name)
-        # Add message to the list
-        new_messages.append({
-            'message_id': message_id,
-            'content': message_text,
-            'timestamp': timestamp,
-            'hashed_sender_name': hashed_sender_name,
-        })
+        new_messages.append(to_outbound_message(record, message_id))
 
     # Return new messages sorted by timestamp
     new_messages.sort(key=lambda x: float(x['message_id']))
     return new_messages
 
-def send_message_via_websocket(content, timestamp, hashed_sender_name):
+def send_message_via_websocket(content, timestamp, hashed_sender_name, context=None, thread_ts=None, chat_id=None):
     """
-    Sends the new message to the back end via WebSocket.
+    Sends the new message to the back end via WebSocket, along with the
+    chat's encoded context window when available. The chat id comes back
+    with the selected reply, so it is delivered to the chat the message
+    came from; thread replies also carry the parent message's ts as thread_ts.
     """
     try:
         # Send the content, timestamp, and hashed sender's name
-        sio.emit(
-            "newMessage",
+        payload = {
+            "content": content,
+            "timestamp": timestamp,
+            "user_id": USER_ID,
+            "hashed_sender_name": hashed_sender_name,
+        }
+        if chat_id:
+            payload["chat_id"] = chat_id
+        if context:
+            payload["context"] = context
+        if thread_ts:
+            payload["thread_ts"] = thread_ts
+        emit_event("newMessage", payload)
+        hot_logger.info('Sent message via WebSocket: "%s" at %s', content, timestamp)
+        if "time_to_first_message" not in metrics:
+            report_metric("time_to_first_message", time.monotonic() - started_at)
+    except Exception as e:
+        logger.exception("Failed to send message via WebSocket.")
+
+def notify_message_edited(chat_id, record):
+    """
+    Emits a 'messageEdited' event with the message's new content.
+    """
+    try:
+        emit_event(
+            "messageEdited",
             {
-                "content": content,
-                "timestamp": timestamp,
+                "chat_id": chat_id,
+                "message_id": record['ts'],
+                "content": record['text'],
+                "timestamp": extract_timestamp(record['ts']),
                 "user_id": USER_ID,
-                "hashed_sender_name": hashed_sender_name,
+                "hashed_sender_name": hash_sender_name_with_salt(record['sender_name']),
             },
-            namespace="/messaging",
         )
-        logger.info(f'Sent message via WebSocket: "{content}" at {timestamp}')
+        logger.info(f"Emitted 'messageEdited' for message {record['ts']} in chat {chat_id}")
     except Exception as e:
-        logger.exception("Failed to send message via WebSocket.")
+        logger.exception("Failed to emit 'messageEdited' event.")
+
+def notify_message_deleted(chat_id, message_id):
+    """
+    Emits a 'messageDeleted' event for a message that is no longer rendered.
+    """
+    try:
+        emit_event(
+            "messageDeleted",
+            {
+                "chat_id": chat_id,
+                "message_id": message_id,
+                "timestamp": extract_timestamp(message_id),
+                "user_id": USER_ID,
+            },
+        )
+        logger.info(f"Emitted 'messageDeleted' for message {message_id} in chat {chat_id}")
+    except Exception as e:
+        logger.exception("Failed to emit 'messageDeleted' event.")
+
+def report_send_status(status, message, item):
+    """
+    Emits a 'messageSent' event with the delivery status of a queued reply.
+    """
+    try:
+        emit_event('messageSent', {
+            'status': status,
+            'message': message,
+            'chat_id': item.get('chat_id'),
+            'message_timestamp': item.get('message_timestamp'),
+        })
+    except Exception as e:
+        logger.exception("Failed to emit 'messageSent' event.")
 
-def send_response_to_slack(response):
+def send_response_to_slack(response, item=None):
     """
-    Uses Selenium to send the selected response to Slack.
+    Uses Selenium to send the selected response to the currently open Slack conversation.
+    Replies to thread messages (items with a thread_ts) are typed into the open
+    thread's input box, everything else into the main one.
     """
+    item = item or {}
     try:
         # Wait for the message input to be available
         wait = WebDriverWait(driver, 10)
 
-        # Check if a thread is open by looking for the thread input box
-        try:
+        if item.get('thread_ts'):
             # Locate the thread input box
             message_input = wait.until(
                 EC.presence_of_element_located(
@@ -511,9 +1317,9 @@ def send_response_to_slack(response):
                     )
                 )
             )
-            logger.info("Thread input box found. Sending response to thread.")
-        except (TimeoutException, NoSuchElementException):
-            # If thread input box is not found, use the main message input box
+            logger.info(f"Sending response to thread {item['thread_ts']}.")
+        else:
+            # Use the main message input box
             message_input = wait.until(
                 EC.presence_of_element_located(
                     (
@@ -522,7 +1328,7 @@ def send_response_to_slack(response):
                     )
                 )
             )
-            logger.info("Thread input box not found. Sending response to main chat.")
+            logger.info("Sending response to main chat.")
 
         # Click to focus
         message_input.click()
@@ -546,53 +1352,154 @@ def send_response_to_slack(response):
 
         logger.info(f"Sent response to Slack: {response}")
         # Emit messageSent event after successful send
-        sio.emit('messageSent', {
-            'status': 'success',
-            'message': 'Message sent to Slack successfully'
-        }, namespace='/messaging')
+        report_send_status('success', 'Message sent to Slack successfully', item)
 
     except NoSuchElementException as e:
         logger.exception("Failed to locate Slack message input.")
+        report_send_status('error', str(e), item)
     except ElementNotInteractableException as e:
         logger.exception("Slack message input not interactable.")
+        report_send_status('error', str(e), item)
     except Exception as e:
         logger.exception("Failed to send response to Slack.")
         # Emit failure event
-        sio.emit('messageSent', {
-            'status': 'error',
-            'message': str(e)
-        }, namespace='/messaging')
+        report_send_status('error', str(e), item)
+
+def enqueue_outbound_response(chat_id, response, message_timestamp=None, thread_ts=None):
+    """
+    Queues a reply for delivery to chat_id (in the thread of thread_ts, if given)
+    and wakes the sender thread.
+    """
+    with outbound_condition:
+        outbound_queues.setdefault(chat_id, deque()).append({
+            'chat_id': chat_id,
+            'response': response,
+            'message_timestamp': message_timestamp,
+            'thread_ts': thread_ts,
+        })
+        outbound_condition.notify()
+
+def take_outbound_batch(block=True):
+    """
+    Waits for queued replies (unless block is False) and takes everything
+    queued so far as one batch. Returns a list of (chat_id, items) pairs.
+    """
+    with outbound_condition:
+        while block and running and not outbound_queues:
+            outbound_condition.wait(timeout=POLL_INTERVAL)
+        batch = [(chat_id, list(items)) for chat_id, items in outbound_queues.items()]
+        outbound_queues.clear()
+    return batch
+
+def deliver_outbound_batch(batch):
+    """
+    Sends a batch of queued replies, switching to each target chat at most once
+    and opening each thread a reply belongs to, then returns to the monitored
+    conversation and the thread it had open.
+    """
+    monitored_id = selected_conversation['id'] if selected_conversation else None
+
+    # Deliver to the open conversation first since it needs no switch
+    batch.sort(key=lambda entry: entry[0] is not None and entry[0] != monitored_id)
+
+    with driver_lock:
+        monitored_thread_ts = open_thread_parent_ts(driver)
+        switched = False
+        for chat_id, items in batch:
+            if chat_id is not None and chat_id != monitored_id:
+                try:
+                    navigate_to_conversation(chat_id)
+                    switched = True
+                except Exception as e:
+                    for item in items:
+                        report_send_status('error', str(e), item)
+                    continue
+
+            for item in items:
+                # Never fall back to the main pane: a thread reply posted there lands out of context
+                if item.get('thread_ts'):
+                    try:
+                        opened = show_thread(driver, item['thread_ts'])
+                    except Exception:
+                        logger.exception(f"Failed to open thread {item['thread_ts']}.")
+                        opened = False
+                    if not opened:
+                        report_send_status('error', f"Could not open thread {item['thread_ts']}.", item)
+                        continue
+                send_response_to_slack(item['response'], item)
+
+        if switched and monitored_id:
+            try:
+                navigate_to_conversation(
+                    monitored_id, selected_conversation['name'], selected_conversation['type']
+                )
+            except Exception:
+                logger.exception("Failed to return to monitored conversation.")
+
+        try:
+            if not show_thread(driver, monitored_thread_ts):
+                logger.warning(f"Could not reopen thread {monitored_thread_ts} after sending replies.")
+        except Exception:
+            logger.exception("Failed to restore the open thread after sending replies.")
+
+def outbound_sender_loop():
+    """
+    Background loop that delivers queued replies in batches.
+    """
+    while running:
+        batch = take_outbound_batch()
+        if batch:
+            deliver_outbound_batch(batch)
+
+@sio.on("startProfiler", namespace=MESSAGING_NAMESPACE)
+def on_start_profiler(data):
+    start_profiling(float((data or {}).get("duration_seconds", PROFILE_DURATION)))
+
+@sio.on("setHotPathLogging", namespace=MESSAGING_NAMESPACE)
+def on_set_hot_path_logging(data):
+    enabled = bool(data.get("enabled"))
+    set_hot_path_logging(enabled)
+    logger.info("Hot-path logging %s", "enabled" if enabled else "disabled")
 
-@sio.on("sendSelectedResponse", namespace="/messaging")
+@sio.on("sendSelectedResponse", namespace=MESSAGING_NAMESPACE)
 def on_send_selected_response(data):
     selected_response = data.get("selected_response")
     if selected_response:
         logger.info(f"Received selected response: {selected_response}")
-        send_response_to_slack(selected_response)
+        # Default to the monitored conversation when no target chat is given
+        chat_id = data.get("chat_id") or (selected_conversation['id'] if selected_conversation else None)
+        enqueue_outbound_response(chat_id, selected_response, data.get("message_timestamp"), data.get("thread_ts"))
     else:
         logger.error("Received sendSelectedResponse event without selected_response")
 
+# Channel, DM and group DM ids as they appear in client URLs (/client/T…/C…[/thread/C…-ts])
+CHANNEL_ID_PATTERN = re.compile(r"[CDG][A-Z0-9]{2,}")
+
+def channel_id_from_path(path):
+    """Returns the last channel id segment of a client URL path, or None."""
+    return next(
+        (part for part in reversed(path.split('/')) if CHANNEL_ID_PATTERN.fullmatch(part)), None
+    )
+
 def get_current_chat_id(driver):
     """
-    Returns a unique identifier for the current chat, based on the URL.
+    Returns the channel id of the current chat, based on the URL: the same
+    id the sidebar uses, so it can be navigated to and compared with selections.
     """
     try:
         current_url = driver.current_url
         parsed_url = urllib.parse.urlparse(current_url)
-        channel_id = urllib.parse.parse_qs(parsed_url.query).get('channel', [None])[0]
+        channel_id = (
+            urllib.parse.parse_qs(parsed_url.query).get('channel', [None])[0]
+            or channel_id_from_path(parsed_url.path)
+        )
 
         if channel_id:
-            logger.info(f"Current chat ID: {channel_id}")
+            hot_logger.info("Current chat ID: %s", channel_id)
             return channel_id
         else:
-            # Fallback: Use the path
-            path = parsed_url.path
-            if path:
-                logger.info(f"Current chat path: {path}")
-                return path
-            else:
-                logger.warning("Unable to determine current chat ID.")
-                return None
+            logger.warning("Unable to determine current chat ID from %s.", parsed_url.path)
+            return None
     except Exception as e:
         logger.exception("Error getting current chat ID.")
         return None
@@ -605,10 +1512,9 @@ def notify_chat_changed(new_chat_id):
     """
     try:
         # Emit the 'chatChanged' event to the backend's '/messaging' namespace
-        sio.emit(
+        emit_event(
             "chatChanged",
             {"new_chat_id": new_chat_id},
-            namespace="/messaging",
         )
         logger.info(f"Emitted 'chatChanged' event with new_chat_id: {new_chat_id}")
     except Exception as e:
@@ -619,37 +1525,30 @@ def process_chat_change(driver):
     Handles chat/thread state changes by collecting and processing new messages.
     Returns the new state values.
     """
+    # Refresh the context windows for the new chat and any open thread
+    chat_id = get_current_chat_id(driver)
+    main_records, thread_ts, thread_records = scan_open_panes(driver)
+    update_chat_context(chat_id, main_records)
+    context_key = chat_id
+    records = main_records
+    if thread_ts is not None:
+        context_key = thread_context_key(chat_id, thread_ts)
+        records = thread_records
+        update_chat_context(context_key, thread_records)
+
     # Find last message from 'me'
-    last_message_from_me_ts_float = find_last_message_from_me(driver)
+    last_message_from_me_ts_float = find_last_message_from_me(driver, main_records)
     
     if last_message_from_me_ts_float is None:
-        # If no previous messages from me, get the last 5 messages
-        try:
-            messages = driver.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background")
-            messages_to_process = []
-            
-            # Take up to last 5 messages, excluding messages from 'me'
-            for message in reversed(messages[-5:] if len(messages) > 5 else messages):
-                sender_name = extract_sender_name(message)
-                if "pearl" not in sender_name.lower():
-                    timestamp_element = message.find_element(By.CSS_SELECTOR, "a.c-timestamp")
-                    message_id = timestamp_element.get_attribute("data-ts")
-                    content = extract_message_text(message)
-                    timestamp = extract_timestamp(message_id)
-                    hashed_sender_name = hash_sender_name_with_salt(sender_name)
-                    
-                    messages_to_process.insert(0, {
-                        'message_id': message_id,
-                        'content': content,
-                        'timestamp': timestamp,
-                        'hashed_sender_name': hashed_sender_name
-                    })
-        except Exception as e:
-            logger.exception("Error collecting last 5 messages")
-            messages_to_process = []
+        # If no previous messages from me, take up to the last 5 messages, excluding messages from 'me'
+        messages_to_process = [
+            to_outbound_message(record, record['ts'])
+            for record in main_records[-5:]
+            if record['ts'] and not record['from_me']
+        ]
     else:
         # Collect messages after last message from 'me'
-        messages_to_process = collect_messages_after(driver, last_message_from_me_ts_float)
+        messages_to_process = collect_messages_after(driver, last_message_from_me_ts_float, records)
     
     # Update last_processed_ts_float if we found messages
     last_processed_ts_float = (
@@ -658,11 +1557,15 @@ def process_chat_change(driver):
     )
         
     # Process all messages
+    context = encode_context_window(context_key)
     for message in messages_to_process:
         send_message_via_websocket(
             message['content'], 
             message['timestamp'], 
-            message['hashed_sender_name']
+            message['hashed_sender_name'],
+            context,
+            thread_ts=thread_ts,
+            chat_id=chat_id,
         )
         
     return last_message_from_me_ts_float, last_processed_ts_float
@@ -681,11 +1584,12 @@ def get_workspace_data():
         workspace_header = driver.find_element(By.CSS_SELECTOR, "button[data-qa='workspace_actions_button']")
         workspace_data['name'] = workspace_header.find_element(By.CLASS_NAME, "p-ia4_home_header_menu__team_name").text.strip()
         
-        # Use our helper functions instead of duplicating code
-        workspace_data['channels'] = get_channels(driver)
-        workspace_data['dms'] = get_dms(driver)
-        workspace_data['privateChannels'] = get_private_channels(driver)
-        workspace_data['groupDms'] = get_group_dms(driver)
+        # One sidebar scan refreshes the conversation index and fills every list
+        entries = sync_sidebar_index(driver)
+        workspace_data['channels'] = [entry for entry in entries if entry['type'] == 'channel']
+        workspace_data['dms'] = [entry for entry in entries if entry['type'] == 'dm']
+        workspace_data['privateChannels'] = [entry for entry in entries if entry['type'] == 'private']
+        workspace_data['groupDms'] = [entry for entry in entries if entry['type'] == 'group']
 
     except Exception as e:
         logger.error(f"Error getting workspace data: {e}")
@@ -699,12 +1603,11 @@ def emit_workspace_update():
     try:
         workspace_data = get_workspace_data()
         if workspace_data:
-            sio.emit(
-                "workspaceUpdate",
-                workspace_data,
-                namespace="/messaging"
+            emit_event("workspaceUpdate", workspace_data)
+            hot_logger.info(
+                "Sent workspace update: %s (%s channels, %s DMs)",
+                workspace_data['name'], len(workspace_data['channels']), len(workspace_data['dms']),
             )
-            logger.info(f"Sent workspace update: {workspace_data}")
     except Exception as e:
         logger.exception("Error sending workspace update")
 
@@ -716,61 +1619,41 @@ def get_current_workspace_name(driver):
     except:
         return None
 
-def get_channels(driver):
-    """Get list of channels from Slack."""
-    try:
-        channels = []
-        channel_elements = driver.find_elements(By.CSS_SELECTOR, "div.p-channel_sidebar__channel[data-qa-channel-sidebar-channel-type='channel']")
-        for element in channel_elements:
-            name = element.find_element(By.CLASS_NAME, "p-channel_sidebar__name").text.strip()
-            channel_id = element.get_attribute('data-qa-channel-sidebar-channel-id')
-            channels.append({'id': channel_id, 'name': name, 'type': 'channel'})
-        return channels
-    except Exception as e:
-        logger.error(f"Error getting channels: {e}")
-        return []
-
-def get_dms(driver):
-    """Get list of direct messages."""
-    try:
-        dms = []
-        dm_elements = driver.find_elements(By.CSS_SELECTOR, "div.p-channel_sidebar__channel[data-qa-channel-sidebar-channel-type='im']")
-        for element in dm_elements:
-            name = element.find_element(By.CLASS_NAME, "p-channel_sidebar__name").text.strip()
-            dm_id = element.get_attribute('data-qa-channel-sidebar-channel-id')
-            dms.append({'id': dm_id, 'name': name, 'type': 'dm'})
-        return dms
-    except Exception as e:
-        logger.error(f"Error getting DMs: {e}")
-        return []
-
-def get_private_channels(driver):
-    """Get list of private channels."""
-    try:
-        private_channels = []
-        private_elements = driver.find_elements(By.CSS_SELECTOR, "div.p-channel_sidebar__channel[data-qa-channel-sidebar-channel-type='private']")
-        for element in private_elements:
-            name = element.find_element(By.CLASS_NAME, "p-channel_sidebar__name").text.strip()
-            channel_id = element.get_attribute('data-qa-channel-sidebar-channel-id')
-            private_channels.append({'id': channel_id, 'name': name, 'type': 'private'})
-        return private_channels
-    except Exception as e:
-        logger.error(f"Error getting private channels: {e}")
-        return []
-
-def get_group_dms(driver):
-    """Get list of group DMs."""
-    try:
-        group_dms = []
-        group_elements = driver.find_elements(By.CSS_SELECTOR, "div.p-channel_sidebar__channel[data-qa-channel-sidebar-channel-type='mpim']")
-        for element in group_elements:
-            name = element.find_element(By.CLASS_NAME, "p-channel_sidebar__name").text.strip()
-            dm_id = element.get_attribute('data-qa-channel-sidebar-channel-id')
-            group_dms.append({'id': dm_id, 'name': name, 'type': 'group'})
-        return group_dms
-    except Exception as e:
-        logger.error(f"Error getting group DMs: {e}")
-        return []
+# Collects id, name and type for every rendered sidebar entry in a single round trip
+SCAN_SIDEBAR_SCRIPT = """
+const entries = [];
+for (const node of document.querySelectorAll('div.p-channel_sidebar__channel')) {
+    const nameEl = node.querySelector('.p-channel_sidebar__name');
+    entries.push({
+        id: node.getAttribute('data-qa-channel-sidebar-channel-id'),
+        name: nameEl ? nameEl.innerText.trim() : '',
+        sidebar_type: node.getAttribute('data-qa-channel-sidebar-channel-type'),
+    });
+}
+return entries;
+"""
+
+def sync_sidebar_index(driver):
+    """
+    Scans the rendered sidebar, adds or refreshes its entries in the
+    conversation index, and returns the rendered entries in sidebar order.
+    """
+    rendered = []
+    for entry in driver.execute_script(SCAN_SIDEBAR_SCRIPT) or []:
+        conversation_type = SIDEBAR_TYPES.get(entry.get('sidebar_type'))
+        if not entry.get('id') or not conversation_type:
+            continue
+        conversation = {'id': entry['id'], 'name': entry['name'], 'type': conversation_type}
+        conversation_index[entry['id']] = conversation
+        rendered.append(conversation)
+    return rendered
+
+def find_conversation_id(name, conversation_type=None):
+    """Looks up a conversation's id in the index by case-insensitive name."""
+    for conversation in conversation_index.values():
+        if conversation['name'].lower() == name.lower() and conversation_type in (None, conversation['type']):
+            return conversation['id']
+    return None
 
 def get_user_input(prompt: str) -> str:
     """Get user input with proper error handling."""
@@ -809,7 +1692,7 @@ def collect_workspaces():
             workspaces[current_workspace_name] = workspace_data
             
             # Emit workspace data to frontend
-            sio.emit('workspaceUpdate', workspace_data, namespace='/messaging')
+            emit_event('workspaceUpdate', workspace_data)
             
             # Ask user if they want to add another workspace
             response = get_user_input("\nWould you like to add another workspace? (y/n): ")
@@ -828,29 +1711,136 @@ def collect_workspaces():
     return workspaces
 
 
-def messaging_client():
-    global driver, selected_conversation
+def connect_to_server():
+    """Connect the Socket.IO client to the backend's /messaging namespace."""
+    sio.connect(
+        WEBSOCKET_SERVER_URL,
+        namespaces=[MESSAGING_NAMESPACE],
+        transports=["websocket"],
+        auth={"user_id": USER_ID},
+        socketio_path="/socket.io"
+    )
+    logger.info(f"Connecting to WebSocket server: {WEBSOCKET_SERVER_URL}")
+
+def attach_driver(start_sender=True):
+    """Attach to Chrome and, unless start_sender is False, start the outbound sender thread."""
+    global driver
+
+    # Initialize Selenium WebDriver
+    driver = initialize_selenium()
+    logger.info("Selenium WebDriver initialized and connected to Chrome.")
+
+    # Identify 'me' once so scans can skip my own messages by member id
+    resolve_self_member_ids(driver)
+    driver_attached.set()
+
+    # Start delivering queued replies in the background
+    if start_sender:
+        threading.Thread(target=outbound_sender_loop, name="outbound-sender", daemon=True).start()
+
+def load_client_state():
+    """Returns the state last written by save_client_state, or None."""
+    try:
+        with open(STATE_FILE) as state_file:
+            return json.load(state_file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.exception("Failed to load client state.")
+        return None
 
-    # Track last sent message id per chat
-    last_sent_message_id_per_chat = {}
-    last_sent_chat_id = None
+def save_client_state(cursors):
+    """
+    Writes the selected conversation, per-chat cursors and thread cursors to
+    STATE_FILE (atomically, and only if they changed).
+    """
+    global saved_client_state
+
+    state = json.dumps({
+        'selected_conversation': selected_conversation,
+        'cursors': cursors,
+        'thread_cursors': thread_cursors,
+    }, sort_keys=True)
+    if state == saved_client_state:
+        return
+
+    try:
+        temp_path = f"{STATE_FILE}.tmp"
+        with open(temp_path, "w") as state_file:
+            state_file.write(state)
+        os.replace(temp_path, STATE_FILE)
+        saved_client_state = state
+    except Exception as e:
+        logger.exception("Failed to save client state.")
+
+def restore_conversation(state):
+    """
+    Restores the thread cursors in state (as loaded from STATE_FILE) and
+    reopens its selected conversation, unless one was selected from the
+    frontend in the meantime. Returns True if a conversation is selected.
+    """
+    global selected_conversation
+
+    thread_cursors.update(state.get('thread_cursors') or {})
+
+    restored = state.get('selected_conversation')
+    if not restored:
+        return False
+    try:
+        with driver_lock:
+            # A selection made while attaching is newer than the saved one
+            if selected_conversation:
+                logger.info("A conversation was selected during startup; not restoring the saved one.")
+                return True
+            navigate_to_conversation(restored['id'], restored['name'], restored['type'])
+            selected_conversation = restored
+        conversation_selected.set()
+        logger.info(f"Restored conversation: {restored['name'] or restored['id']}")
+        return True
+    except Exception as e:
+        logger.exception("Could not restore the last conversation; waiting for a selection.")
+        return False
+
+def fast_start():
+    """
+    Startup path for FAST_START: connects the socket while attaching the
+    driver, reopens the conversation saved in STATE_FILE and resumes polling
+    from its cursors, without the interactive workspace prompts.
+    """
+    state = load_client_state() or {}
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="startup") as pool:
+        connecting = pool.submit(connect_to_server)
+        attaching = pool.submit(attach_driver)
+        attaching.result()
+        try:
+            connecting.result()
+        except Exception as e:
+            logger.exception("Failed to connect to WebSocket server.")
+            sys.exit(1)
+
+    if not restore_conversation(state):
+        # The frontend needs the sidebar to offer a selection
+        emit_workspace_update()
+
+    # Watch the driver and socket from here on
+    threading.Thread(target=watchdog_loop, name="watchdog", daemon=True).start()
+
+    poll_loop(cursors=state.get('cursors'))
+
+def messaging_client():
+    if FAST_START:
+        fast_start()
+        return
 
     try:
         # Connect to WebSocket server
-        sio.connect(
-            WEBSOCKET_SERVER_URL,
-            namespaces=["/messaging"],
-            transports=["websocket"],
-            socketio_path="/socket.io"
-        )
-        logger.info(f"Connecting to WebSocket server: {WEBSOCKET_SERVER_URL}")
+        connect_to_server()
     except Exception as e:
         logger.exception("Failed to connect to WebSocket server.")
         sys.exit(1)
 
-    # Initialize Selenium WebDriver
-    driver = initialize_selenium()
-    logger.info("Selenium WebDriver initialized and connected to Chrome.")
+    attach_driver()
 
     # Collect all workspaces interactively
     logger.info("Starting workspace collection...")
@@ -862,60 +1852,148 @@ def messaging_client():
     
     logger.info(f"Collected {len(workspaces)} workspace(s)")
 
+    # Watch the driver and socket from here on
+    threading.Thread(target=watchdog_loop, name="watchdog", daemon=True).start()
+
+    poll_loop()
+
+class PollState:
+    """Cursors the poll loop carries from one cycle to the next."""
+
+    def __init__(self, cursors=None):
+        # Track last sent message id per chat
+        self.last_sent_message_id_per_chat = {}
+        # Cursors restored from disk, each used the first time its chat is polled
+        self.restored_cursors = dict(cursors or {})
+        self.last_sent_chat_id = None
+
+    def cursor(self, scope_id):
+        """
+        Returns the last sent message id for a chat or thread scope, taking
+        its restored cursor the first time the scope is polled.
+        """
+        if scope_id not in self.last_sent_message_id_per_chat and scope_id in self.restored_cursors:
+            self.last_sent_message_id_per_chat[scope_id] = self.restored_cursors.pop(scope_id)
+        return self.last_sent_message_id_per_chat.get(scope_id)
+
+def poll_once(state):
+    """
+    Runs one poll cycle over the selected conversation: scans it, sends the
+    latest new message, emits edits and deletions and follows its threads.
+    After a catch-up, the latest message's context window holds every
+    recovered message rather than the usual CONTEXT_WINDOW_SIZE.
+    """
+    global monitored_chat_id
+
+    with driver_lock:
+        hot_logger.info("Monitoring conversation: %s", selected_conversation['name'])
+
+        # Get current chat id
+        current_chat_id = get_current_chat_id(driver)
+        monitored_chat_id = current_chat_id
+
+        # If chat has changed, notify backend and reset last sent message id for this chat
+        # (or resume from its restored cursor, so messages missed while stopped are caught up)
+        if current_chat_id != state.last_sent_chat_id:
+            logger.info(f"Chat changed from {state.last_sent_chat_id} to {current_chat_id}")
+            notify_chat_changed(current_chat_id)
+            state.last_sent_chat_id = current_chat_id
+            state.last_sent_message_id_per_chat[current_chat_id] = state.restored_cursors.pop(current_chat_id, None)
+
+        # Bulk-scan the main pane (and the thread pane, if one is open) once
+        main_records, thread_ts, thread_records = scan_open_panes(driver)
+
+        # Channel-level state only ever comes from the main pane: recover any range
+        # lost to virtualization, then refresh the channel's context window
+        channel_cursor = state.last_sent_message_id_per_chat.get(current_chat_id)
+        context_size = CONTEXT_WINDOW_SIZE
+        if has_rendered_gap(main_records, channel_cursor):
+            logger.info("Gap after message %s in chat %s; catching up.", channel_cursor, current_chat_id)
+            main_records = catch_up_missing_messages(driver, MAIN_MESSAGE_SELECTOR, channel_cursor, main_records)
+            # Only the latest message is sent, so its context carries everything that was missed
+            context_size = max(CONTEXT_WINDOW_SIZE, count_records_after(main_records, channel_cursor))
+        update_chat_context(current_chat_id, main_records, context_size)
+
+        # With a thread open, new messages come from the thread, with its own cursor and context window
+        scope_id = current_chat_id
+        records = main_records
+        if thread_ts is not None:
+            scope_id = thread_context_key(current_chat_id, thread_ts)
+            records = thread_records
+            update_chat_context(scope_id, thread_records)
+
+        # Get the last sent message id for this chat (or open thread, whose "<chat>:<ts>" cursor may be restored)
+        last_sent_message_id = state.cursor(scope_id)
+
+        # Detect new messages (from others) since last sent message in this chat
+        new_messages = detect_new_messages(driver, last_sent_message_id, records)
+        hot_logger.info("Detected %s new messages in %s", len(new_messages), scope_id)
+        hot_logger.info("Last sent message ID: %s", last_sent_message_id)
+
+        # Only send the latest new message (if any) to backend
+        if new_messages:
+            hot_logger.info("Sending %s new messages to backend", len(new_messages))
+            latest_message = new_messages[-1]
+            send_message_via_websocket(
+                latest_message['content'],
+                latest_message['timestamp'],
+                latest_message['hashed_sender_name'],
+                encode_context_window(scope_id),
+                thread_ts=thread_ts,
+                chat_id=current_chat_id,
+            )
+            # Always update the last sent message id, even if only one message is sent
+            state.last_sent_message_id_per_chat[scope_id] = latest_message['message_id']
+            hot_logger.info("Sent latest message to backend: %s", latest_message['content'])
+            hot_logger.info("Updated last sent message ID for %s: %s", scope_id, latest_message['message_id'])
+        else:
+            # If no new messages, but there are messages in the chat, update the last_sent_message_id to the latest message in the chat
+            latest_ids = [record['ts'] for record in records if record['ts']]
+            if latest_ids:
+                state.last_sent_message_id_per_chat[scope_id] = latest_ids[-1]
+                hot_logger.info("No new messages, set last_sent_message_id for %s to %s", scope_id, latest_ids[-1])
+
+        # Emit edit/delete events for messages already seen in this chat (main pane only)
+        detect_edits_and_deletions(current_chat_id, main_records)
+
+        # Follow replies in the chat's other threads; skipped while the user has a thread open
+        if THREAD_TRACKING and current_chat_id and thread_ts is None:
+            track_threads(driver, current_chat_id)
+
+def poll_loop(on_cycle=None, cursors=None):
+    """
+    Polls the selected conversation for new messages until shutdown.
+    on_cycle, if given, is called after each poll cycle that succeeded (or
+    had nothing selected to poll), e.g. to record a heartbeat that goes stale
+    while cycles keep failing. cursors, if given, maps chat ids to last sent
+    message ids restored from disk; each is used the first time its chat is polled.
+    """
+    state = PollState(cursors)
+
+    global last_poll_cycle_at, poll_cycle_id
+
     while running:
+        last_poll_cycle_at = time.monotonic()
+        poll_cycle_id += 1
+
         try:
             if not selected_conversation:
-                logger.info("Waiting for conversation selection...")
-                time.sleep(POLL_INTERVAL)
+                hot_logger.info("Waiting for conversation selection...")
+                conversation_selected.wait(POLL_INTERVAL)
+                if on_cycle:
+                    on_cycle()
                 continue
 
-            logger.info(f"Monitoring conversation: {selected_conversation['name']}")
-
-            # Get current chat id
-            current_chat_id = get_current_chat_id(driver)
-
-            # If chat has changed, notify backend and reset last sent message id for this chat
-            if current_chat_id != last_sent_chat_id:
-                logger.info(f"Chat changed from {last_sent_chat_id} to {current_chat_id}")
-                notify_chat_changed(current_chat_id)
-                last_sent_chat_id = current_chat_id
-                last_sent_message_id_per_chat[current_chat_id] = None
-
-            # Get the last sent message id for this chat
-            last_sent_message_id = last_sent_message_id_per_chat.get(current_chat_id)
-
-            # Detect new messages (from others) since last sent message in this chat
-            new_messages = detect_new_messages(driver, last_sent_message_id)
-            logger.info(f"Detected {len(new_messages)} new messages in chat {current_chat_id}")
-            logger.info(f"Last sent message ID: {last_sent_message_id}")
-
-            # Only send the latest new message (if any) to backend
-            if new_messages:
-                logger.info(f"Sending {len(new_messages)} new messages to backend")
-                latest_message = new_messages[-1]
-                send_message_via_websocket(
-                    latest_message['content'],
-                    latest_message['timestamp'],
-                    latest_message['hashed_sender_name']
-                )
-                # Always update the last sent message id, even if only one message is sent
-                last_sent_message_id_per_chat[current_chat_id] = latest_message['message_id']
-                logger.info(f"Sent latest message to backend: {latest_message['content']}")
-                logger.info(f"Updated last sent message ID for chat {current_chat_id}: {latest_message['message_id']}")
-            else:
-                # If no new messages, but there are messages in the chat, update the last_sent_message_id to the latest message in the chat
-                messages = driver.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background")
-                if messages:
-                    try:
-                        timestamp_element = messages[-1].find_element(By.CSS_SELECTOR, "a.c-timestamp")
-                        message_id = timestamp_element.get_attribute("data-ts")
-                        last_sent_message_id_per_chat[current_chat_id] = message_id
-                        logger.info(f"No new messages, set last_sent_message_id for chat {current_chat_id} to {message_id}")
-                    except Exception:
-                        pass
+            poll_once(state)
 
             # Emit workspace update after polling for new messages
-            emit_workspace_update()
+            with driver_lock:
+                emit_workspace_update()
+
+            save_client_state(state.last_sent_message_id_per_chat)
+
+            if on_cycle:
+                on_cycle()
 
         except Exception as e:
             logger.exception("Error in main loop.")
@@ -923,7 +2001,7 @@ def messaging_client():
         time.sleep(POLL_INTERVAL)
 
 # Add these socket event handlers at the module level, before messaging_client()
-@sio.on('selectConversation', namespace='/messaging')
+@sio.on('selectConversation', namespace=MESSAGING_NAMESPACE)
 def on_select_conversation(data):
     """Handle conversation selection from frontend."""
     global selected_conversation
@@ -935,62 +2013,279 @@ def on_select_conversation(data):
         conversation_name = data.get('name')  # Add name to the data sent from frontend
         conversation_type = data.get('type')
         logger.info(f"Parsed conversation details - ID: {conversation_id}, Name: {conversation_name}, Type: {conversation_type}")
-        
-        # Set the selected conversation
-        selected_conversation = {
-            'id': conversation_id,
-            'name': conversation_name,
-            'type': conversation_type
-        }
-        
-        # Click the conversation in Slack
-        logger.info(f"Attempting to click conversation: {conversation_name}")
-        click_conversation_by_name(conversation_name, conversation_type)
-        
-        # Get initial messages after switching
-        logger.info("Getting initial messages...")
-        last_message_from_me_ts_float, last_processed_ts_float = process_chat_change(driver)
-        
+
+        # With FAST_START the frontend can select before the driver is attached; hold the selection until it is
+        if not driver_attached.wait(ATTACH_WAIT_TIMEOUT):
+            raise Exception(f"WebDriver not attached after {ATTACH_WAIT_TIMEOUT}s")
+
+        with driver_lock:
+            # Set the selected conversation under the lock, so a startup restore cannot overwrite it
+            selected_conversation = {
+                'id': conversation_id,
+                'name': conversation_name,
+                'type': conversation_type
+            }
+
+            # Open the conversation in Slack
+            navigate_to_conversation(conversation_id, conversation_name, conversation_type)
+
+            # Get initial messages after switching
+            logger.info("Getting initial messages...")
+            last_message_from_me_ts_float, last_processed_ts_float = process_chat_change(driver)
+
+        conversation_selected.set()
         logger.info("=== Conversation Selection Flow Complete ===")
     except Exception as e:
         logger.error("=== Conversation Selection Flow Failed ===")
         logger.error(f"Error in conversation selection: {e}")
         selected_conversation = None
+        conversation_selected.clear()
         raise
 
-def click_conversation_by_name(name: str, type_attr: str):
-    """Click on conversation by matching its name."""
-    global driver
+def get_primary_pane_label(driver):
+    panes = driver.find_elements(By.CSS_SELECTOR, 'div.p-view_contents.p-view_contents--primary')
+    return panes[0].get_attribute('aria-label') if panes else None
+
+def open_via_quick_switcher(name):
+    """Opens a conversation through Slack's quick switcher (Ctrl/Cmd+K)."""
+    modifier = Keys.COMMAND if sys.platform == 'darwin' else Keys.CONTROL
+    previously_focused = driver.switch_to.active_element
+    ActionChains(driver).key_down(modifier).send_keys('k').key_up(modifier).perform()
+
+    # Wait for focus to move into the switcher so nothing is typed into the message input
+    def switcher_focused(d):
+        focused = d.switch_to.active_element
+        if focused == previously_focused:
+            return False
+        editable = focused.tag_name == 'input' or focused.get_attribute('contenteditable') == 'true'
+        return focused if editable else False
+
+    switcher_input = WebDriverWait(driver, NAVIGATION_TIMEOUT).until(switcher_focused)
+    switcher_input.send_keys(name)
+    time.sleep(0.3)  # Let the switcher rank its results
+    switcher_input.send_keys(Keys.ENTER)
+
+def open_via_url(conversation_id):
+    """Opens a conversation by loading its client URL in the current workspace."""
+    team_id = next((part for part in urllib.parse.urlparse(driver.current_url).path.split('/') if part.startswith(('T', 'E'))), None)
+    if not team_id:
+        raise Exception(f"Cannot build a URL for conversation {conversation_id}: workspace id unknown")
+    driver.get(f"https://app.slack.com/client/{team_id}/{conversation_id}")
+
+def wait_for_conversation_ready(conversation_id, previous_label):
+    """
+    Waits until the URL points at the conversation, the primary pane's
+    aria-label has changed from previous_label, and a message has rendered.
+    Returns False on timeout.
+    """
+    def conversation_ready(d):
+        if conversation_id and conversation_id not in d.current_url:
+            return False
+        label = get_primary_pane_label(d)
+        if not label or label == previous_label:
+            return False
+        return bool(d.find_elements(By.CSS_SELECTOR, "div.c-message_kit__background"))
+
     try:
-        logger.info(f"Looking for conversation: {name} of type {type_attr}")
-        
-        # Map type to Slack's attribute
-        type_mapping = {
-            'channel': 'channel',
-            'dm': 'im',
-            'private': 'private',
-            'group': 'mpim'
-        }
-        slack_type = type_mapping.get(type_attr)
-        
-        # Find all elements of this type
-        elements = driver.find_elements(By.CSS_SELECTOR, 
-            f"div.p-channel_sidebar__channel[data-qa-channel-sidebar-channel-type='{slack_type}']")
-        
-        # Find element with matching name
-        for element in elements:
-            element_name = element.find_element(By.CLASS_NAME, "p-channel_sidebar__name").text.strip()
-            if element_name.lower() == name.lower():
-                logger.info(f"Found matching conversation: {name}")
-                driver.execute_script("arguments[0].click();", element)
-                time.sleep(1)  # Wait for conversation to load
-                return
-                
-        raise Exception(f"Could not find conversation: {name}")
-        
-    except Exception as e:
-        logger.error(f"Error clicking conversation: {e}")
-        raise
+        WebDriverWait(driver, NAVIGATION_TIMEOUT, poll_frequency=0.1).until(conversation_ready)
+        return True
+    except TimeoutException:
+        return False
+
+def navigate_to_conversation(conversation_id, name=None, conversation_type=None):
+    """
+    Opens a conversation by channel id: clicks its sidebar entry when rendered,
+    otherwise uses the quick switcher (falling back to a direct URL). Waits for
+    readiness instead of sleeping and reports the switch latency.
+    """
+    started_at = time.monotonic()
+
+    if not conversation_id and name:
+        conversation_id = find_conversation_id(name, conversation_type)
+    if conversation_id and not name and conversation_id in conversation_index:
+        name = conversation_index[conversation_id]['name']
+    if not conversation_id and not name:
+        raise Exception("Cannot navigate to a conversation without an id or name")
+
+    if conversation_id and conversation_id in driver.current_url:
+        return
+
+    previous_label = get_primary_pane_label(driver)
+    logger.info(f"Navigating to conversation: {name or conversation_id}")
+
+    entries = driver.find_elements(By.CSS_SELECTOR,
+        f"div.p-channel_sidebar__channel[data-qa-channel-sidebar-channel-id='{conversation_id}']") if conversation_id else []
+    if entries:
+        method = 'sidebar'
+        driver.execute_script("arguments[0].click();", entries[0])
+    elif name:
+        method = 'quick_switcher'
+        open_via_quick_switcher(name)
+    else:
+        method = 'url'
+        open_via_url(conversation_id)
+
+    ready = wait_for_conversation_ready(conversation_id, previous_label)
+    if not ready and method == 'quick_switcher' and conversation_id:
+        logger.warning(f"Quick switcher did not open {name}; loading its URL instead.")
+        method = 'url'
+        open_via_url(conversation_id)
+        ready = wait_for_conversation_ready(conversation_id, previous_label)
+
+    if conversation_id and conversation_id not in driver.current_url:
+        raise Exception(f"Could not open conversation: {name or conversation_id}")
+    if not ready:
+        logger.warning(f"Conversation {name or conversation_id} opened but no messages rendered in time.")
+
+    report_metric(
+        "conversation_switch_seconds", time.monotonic() - started_at,
+        method=method, conversation_id=conversation_id,
+    )
+
+def probe_driver():
+    """
+    Runs a trivial script in the browser with a deadline.
+    Returns True if it answered, False if it failed or timed out, and None if
+    the driver was busy with other work for the whole probe window.
+    """
+    result = {}
+
+    def run_probe():
+        if not driver_lock.acquire(timeout=DRIVER_PROBE_TIMEOUT):
+            result['busy'] = True
+            return
+        try:
+            result['ready_state'] = driver.execute_script("return document.readyState")
+        except Exception as e:
+            result['error'] = e
+        finally:
+            driver_lock.release()
+
+    probe = threading.Thread(target=run_probe, name="driver-probe", daemon=True)
+    probe.start()
+    probe.join(DRIVER_PROBE_TIMEOUT * 2)
+
+    if 'ready_state' in result:
+        return True
+    if result.get('busy'):
+        return None
+    return False
+
+def quit_driver_quietly(old_driver):
+    if old_driver is None:
+        return
+    try:
+        old_driver.quit()
+    except Exception:
+        pass
+
+def recover_driver():
+    """
+    Replaces a dead or wedged WebDriver session (or attaches one, if an attach
+    never finished) and reopens the selected conversation. Per-chat cursors live
+    in the poll loop and carry over unchanged.
+    Returns True once a new session is in place.
+    """
+    global driver, last_poll_cycle_at, chrome_relaunched_at
+    logger.warning("WebDriver unhealthy; rebuilding the session.")
+
+    # Quitting the old session also unblocks any call stuck on it
+    threading.Thread(target=quit_driver_quietly, args=(driver,), daemon=True).start()
+
+    try:
+        new_driver = initialize_selenium()
+    except Exception:
+        if not CHROME_LAUNCH_COMMAND:
+            logger.exception("Failed to reattach to Chrome; will retry.")
+            return False
+        if chrome_relaunched_at is None or time.monotonic() - chrome_relaunched_at > CHROME_RELAUNCH_COOLDOWN:
+            logger.warning("Chrome debug port unavailable; relaunching Chrome.")
+            subprocess.Popen(shlex.split(CHROME_LAUNCH_COMMAND), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            chrome_relaunched_at = time.monotonic()
+        return False
+
+    locked = driver_lock.acquire(timeout=DRIVER_PROBE_TIMEOUT)
+    try:
+        driver = new_driver
+        driver_attached.set()
+        # Commands still stuck on the old session no longer hold anything up
+        driver_calls_in_flight.clear()
+        if selected_conversation:
+            try:
+                navigate_to_conversation(
+                    selected_conversation['id'], selected_conversation['name'], selected_conversation['type']
+                )
+            except Exception:
+                logger.exception("Failed to reopen the selected conversation after recovery.")
+    finally:
+        if locked:
+            driver_lock.release()
+
+    # Give the poll loop a fresh deadline on the new session
+    last_poll_cycle_at = time.monotonic()
+    logger.info("WebDriver session rebuilt.")
+    return True
+
+def recover_socket():
+    """Drops any stalled reconnection attempt and connects again. Returns True on success."""
+    logger.warning("WebSocket still disconnected; reconnecting.")
+    try:
+        sio.disconnect()
+    except Exception:
+        pass
+    try:
+        connect_to_server()
+        return True
+    except Exception:
+        logger.exception("Failed to reconnect to WebSocket server; will retry.")
+        return False
+
+def watchdog_loop():
+    """
+    Health-checks the driver and socket every WATCHDOG_INTERVAL seconds and
+    rebuilds whichever has failed, reporting how long recovery took.
+    """
+    driver_down_since = None
+    socket_down_since = None
+    last_busy_at = None
+
+    while running:
+        time.sleep(WATCHDOG_INTERVAL)
+        now = time.monotonic()
+
+        # While other work (sending replies, opening threads) holds the driver, the poll loop
+        # is waiting on driver_lock rather than stalled. However long that work takes, only a
+        # single WebDriver command that overruns its deadline counts as a wedge.
+        healthy = probe_driver()
+        call_age = oldest_driver_call_age(time.monotonic())
+        wedged = call_age is not None and call_age > DRIVER_CALL_DEADLINE
+        if healthy is None:
+            last_busy_at = now
+            stalled = False
+        else:
+            stalled = now - max(last_poll_cycle_at, last_busy_at or 0) > POLL_STALL_DEADLINE
+
+        if healthy is False or stalled or wedged:
+            if driver_down_since is None:
+                driver_down_since = now
+                logger.warning(
+                    "Driver check failed (probe=%s, stalled=%s, command running %.0fs).",
+                    healthy, stalled, call_age or 0,
+                )
+            if recover_driver():
+                report_metric("driver_recovery_seconds", time.monotonic() - driver_down_since)
+                driver_down_since = None
+        elif healthy:
+            driver_down_since = None
+
+        if not sio.connected:
+            if socket_down_since is None:
+                socket_down_since = now
+            elif now - socket_down_since >= SOCKET_RECOVERY_DEADLINE:
+                recover_socket()
+        elif socket_down_since is not None:
+            report_metric("socket_recovery_seconds", now - socket_down_since)
+            socket_down_since = None
 
 if __name__ == "__main__":
     try:
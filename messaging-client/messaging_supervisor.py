@@ -0,0 +1,330 @@
+"""
+Runs the messaging client as two supervised processes:
+
+- the scraper worker owns the WebDriver and pushes new messages into a
+  shared-memory ring buffer, and other events onto its outbox;
+- the I/O worker owns the Socket.IO connection, drains the ring and its
+  inbox, and forwards backend commands to the scraper through its outbox.
+
+The supervisor relays each worker's outbox to the other's inbox and restarts
+a worker on its own, with exponential backoff, if it exits or its heartbeat
+goes stale, so a stalled scan never delays socket traffic. Nothing a worker
+can leave locked or half-written is shared with the other: each has its own
+queues, recreated with it, and the ring needs no cross-process lock. A
+restarted scraper resumes from STATE_FILE instead of prompting again.
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import threading
+import time
+
+from client_logging import setup_logging
+from shm_ring import SharedRingBuffer, RECORD_NEW_MESSAGE
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+RING_CAPACITY = int(os.getenv("RING_CAPACITY", "256"))  # Message records held in shared memory
+RING_POLL_INTERVAL = 0.05  # Seconds the I/O worker waits when the ring is empty
+SCRAPER_STALL_DEADLINE = float(os.getenv("SCRAPER_STALL_DEADLINE", "60"))  # Seconds without a successful poll cycle
+IO_STALL_DEADLINE = float(os.getenv("IO_STALL_DEADLINE", "10"))  # Seconds without draining the ring
+SUPERVISOR_CHECK_INTERVAL = 1  # Seconds between worker health checks
+RESTART_BACKOFF_INITIAL = 1  # Seconds before the first restart of a failed worker
+RESTART_BACKOFF_MAX = 60  # Longest wait between restarts of a worker that keeps failing
+RESTART_BACKOFF_RESET = 120  # Seconds a worker must stay healthy before its backoff starts over
+CONNECT_RETRY_MAX = 30  # Longest wait between the I/O worker's attempts to reach the backend
+RELAY_POLL_INTERVAL = 1  # Seconds a relay waits on an outbox before checking whether its worker was replaced
+
+# Backend events that need the driver, forwarded from the I/O worker to the scraper
+COMMAND_HANDLERS = {
+    "selectConversation": "on_select_conversation",
+    "sendSelectedResponse": "on_send_selected_response",
+}
+
+
+class ScraperEmitter:
+    """
+    Stands in for the Socket.IO client inside the scraper worker.
+    newMessage payloads go into the ring buffer; everything else goes onto the outbox.
+    """
+
+    # The socket belongs to the I/O worker; the scraper's watchdog leaves it alone
+    connected = True
+
+    def __init__(self, ring, outbox):
+        self.ring = ring
+        self.outbox = outbox
+
+    def emit(self, event, data=None, namespace=None):
+        if event == "newMessage":
+            if not self.ring.push(
+                RECORD_NEW_MESSAGE,
+                data.get("timestamp"),
+                data.get("hashed_sender_name"),
+                data.get("content") or "",
+                data.get("context"),
+                data.get("chat_id"),
+                data.get("thread_ts"),
+            ):
+                logger.warning("Ring buffer full, dropped a new message.")
+            return
+        self.outbox.put((event, data))
+
+    def disconnect(self):
+        pass
+
+
+def dispatch_commands(client, inbox):
+    """Runs backend commands forwarded by the I/O worker against the scraper's driver."""
+    while True:
+        event, data = inbox.get()
+        try:
+            getattr(client, COMMAND_HANDLERS[event])(data)
+        except Exception:
+            logger.exception(f"Error handling forwarded '{event}' event.")
+
+
+def scraper_worker(ring_name, inbox, outbox, heartbeat, resume):
+    import messaging_slack as client
+
+    heartbeat.value = time.time()
+    ring = SharedRingBuffer.attach(ring_name)
+    client.sio = ScraperEmitter(ring, outbox)
+
+    client.attach_driver()
+    threading.Thread(
+        target=dispatch_commands, args=(client, inbox), name="command-dispatch", daemon=True
+    ).start()
+
+    # After a restart, pick up where the previous scraper left off instead of prompting again
+    state = (client.load_client_state() or {}) if resume else {}
+    if resume:
+        if not client.restore_conversation(state):
+            client.emit_workspace_update()
+    else:
+        logger.info("Starting workspace collection...")
+        if not client.collect_workspaces():
+            logger.warning("No workspaces collected; waiting for a conversation selection.")
+
+    # Rebuild a dead or wedged driver in place; only if that keeps failing does the heartbeat go stale
+    threading.Thread(target=client.watchdog_loop, name="watchdog", daemon=True).start()
+
+    def record_heartbeat():
+        heartbeat.value = time.time()
+
+    # poll_loop calls this only after cycles that succeeded (or found nothing selected to poll)
+    client.poll_loop(on_cycle=record_heartbeat, cursors=state.get('cursors'))
+
+
+def forward_upstream_events(sio, inbox, namespace):
+    """Emits events the scraper queued (chatChanged, workspaceUpdate, messageSent, ...)."""
+    while True:
+        event, data = inbox.get()
+        try:
+            sio.emit(event, data, namespace=namespace)
+        except Exception:
+            logger.exception(f"Failed to emit '{event}' event.")
+
+
+def connect_with_retry(sio, url, namespace, user_id, heartbeat):
+    """Connects to the backend, retrying with backoff while it is unreachable."""
+    import socketio
+
+    delay = 1
+    while True:
+        heartbeat.value = time.time()
+        try:
+            sio.connect(
+                url, namespaces=[namespace], transports=["websocket"], socketio_path="/socket.io",
+                auth={"user_id": user_id},
+            )
+            return
+        except socketio.exceptions.ConnectionError as e:
+            logger.warning(f"Could not reach WebSocket server {url} ({e}); retrying in {delay}s.")
+
+        # Keep the heartbeat fresh while waiting: an unreachable backend is not a stalled worker
+        deadline = time.monotonic() + delay
+        while time.monotonic() < deadline:
+            heartbeat.value = time.time()
+            time.sleep(min(1, delay))
+        delay = min(delay * 2, CONNECT_RETRY_MAX)
+
+
+def io_worker(ring_name, inbox, outbox, heartbeat, resume):
+    # The I/O worker keeps no state, so resume makes no difference to it
+    import socketio
+    from messaging_slack import WEBSOCKET_SERVER_URL, USER_ID, MESSAGING_NAMESPACE
+
+    # Replace the client module's handlers, which would try to quit the driver
+    signal.signal(signal.SIGINT, lambda sig, frame: sys.exit(0))
+    signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0))
+
+    heartbeat.value = time.time()
+    ring = SharedRingBuffer.attach(ring_name)
+    sio = socketio.Client(reconnection=True, reconnection_attempts=0, reconnection_delay=1)
+
+    for event in COMMAND_HANDLERS:
+        sio.on(event, handler=lambda data, event=event: outbox.put((event, data)), namespace=MESSAGING_NAMESPACE)
+
+    connect_with_retry(sio, WEBSOCKET_SERVER_URL, MESSAGING_NAMESPACE, USER_ID, heartbeat)
+    logger.info(f"Connected to WebSocket server: {WEBSOCKET_SERVER_URL}")
+
+    threading.Thread(
+        target=forward_upstream_events, args=(sio, inbox, MESSAGING_NAMESPACE), name="upstream-forward", daemon=True
+    ).start()
+
+    while True:
+        heartbeat.value = time.time()
+        record = ring.pop()
+        if record is None:
+            time.sleep(RING_POLL_INTERVAL)
+            continue
+
+        payload = {
+            "content": record["content"],
+            "timestamp": record["timestamp"],
+            "user_id": USER_ID,
+            "hashed_sender_name": record["hashed_sender_name"],
+        }
+        if record["chat_id"]:
+            payload["chat_id"] = record["chat_id"]
+        if record["context"]:
+            payload["context"] = record["context"]
+        if record["thread_ts"]:
+            payload["thread_ts"] = record["thread_ts"]
+        sio.emit("newMessage", payload, namespace=MESSAGING_NAMESPACE)
+
+
+WORKERS = {
+    "scraper": (scraper_worker, SCRAPER_STALL_DEADLINE),
+    "io": (io_worker, IO_STALL_DEADLINE),
+}
+
+# Where each worker's outbox is relayed
+PEERS = {"scraper": "io", "io": "scraper"}
+
+
+def relay(outbox, peer_inbox, retired):
+    """Moves events from one worker's outbox to the current inbox of its peer until the worker is replaced."""
+    while not retired.is_set():
+        try:
+            item = outbox.get(timeout=RELAY_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+        except (EOFError, OSError):
+            return
+        peer_inbox().put(item)
+
+
+def stop_worker(process):
+    process.terminate()
+    process.join(5)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+def supervise():
+    ctx = multiprocessing.get_context("spawn")
+    ring = SharedRingBuffer.create(RING_CAPACITY)
+    heartbeats = {name: ctx.Value("d", 0.0) for name in WORKERS}
+    # Inboxes exist before either worker starts, so relayed events wait for a restarting peer
+    inboxes = {name: ctx.Queue() for name in WORKERS}
+    processes = {}
+    retired = {}
+    started_at = {}
+    backoff = {name: RESTART_BACKOFF_INITIAL for name in WORKERS}
+    restart_at = {}
+
+    def start_worker(name, resume):
+        target, _ = WORKERS[name]
+        if resume:
+            # The old process may have died holding its inbox's lock
+            inboxes[name] = ctx.Queue()
+        outbox = ctx.Queue()
+        retired[name] = threading.Event()
+        threading.Thread(
+            target=relay, args=(outbox, lambda: inboxes[PEERS[name]], retired[name]),
+            name=f"{name}-relay", daemon=True,
+        ).start()
+
+        heartbeats[name].value = time.time()
+        processes[name] = ctx.Process(
+            target=target,
+            args=(ring.name, inboxes[name], outbox, heartbeats[name], resume),
+            name=name,
+            daemon=True,
+        )
+        processes[name].start()
+        started_at[name] = time.monotonic()
+        logger.info(f"Started worker '{name}' (pid {processes[name].pid}).")
+
+    running = True
+
+    def stop(sig, frame):
+        nonlocal running
+        logger.info("Shutting down supervisor...")
+        running = False
+
+    # Profiling (SIGUSR1) and hot-path logging (SIGUSR2) are about the poll loop, so hand them to the scraper
+    def forward_to_scraper(sig, frame):
+        process = processes.get("scraper")
+        if process is not None and process.is_alive():
+            os.kill(process.pid, sig)
+        else:
+            logger.warning(f"Scraper is not running; ignoring signal {sig}.")
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    # SIGUSR1 and SIGUSR2 do not exist on Windows
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, forward_to_scraper)
+        signal.signal(signal.SIGUSR2, forward_to_scraper)
+
+    try:
+        for name in WORKERS:
+            start_worker(name, resume=False)
+
+        while running:
+            now = time.monotonic()
+            for name, (_, deadline) in WORKERS.items():
+                process = processes.get(name)
+                if process is not None:
+                    if process.is_alive():
+                        stalled_for = time.time() - heartbeats[name].value
+                        if stalled_for < deadline:
+                            if now - started_at[name] >= RESTART_BACKOFF_RESET:
+                                backoff[name] = RESTART_BACKOFF_INITIAL
+                            continue
+                        logger.warning(f"Worker '{name}' stalled for {stalled_for:.1f}s.")
+                        stop_worker(process)
+                    else:
+                        logger.warning(f"Worker '{name}' exited with code {process.exitcode}.")
+
+                    retired[name].set()
+                    processes[name] = None
+                    restart_at[name] = now + backoff[name]
+                    logger.info(f"Restarting worker '{name}' in {backoff[name]}s.")
+                    backoff[name] = min(backoff[name] * 2, RESTART_BACKOFF_MAX)
+
+                if name in restart_at and now >= restart_at[name]:
+                    del restart_at[name]
+                    start_worker(name, resume=True)
+
+            time.sleep(SUPERVISOR_CHECK_INTERVAL)
+    finally:
+        for process in processes.values():
+            if process is not None:
+                stop_worker(process)
+        if ring.dropped():
+            logger.warning(f"Ring buffer dropped {ring.dropped()} message(s).")
+        ring.close()
+        ring.unlink()
+
+
+if __name__ == "__main__":
+    supervise()
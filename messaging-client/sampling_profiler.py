@@ -0,0 +1,60 @@
+import collections
+import os
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """
+    Low-overhead wall-clock profiler: a background thread periodically snapshots
+    every other thread's stack and writes the counts as collapsed stacks
+    ("frame;frame;frame count" per line), ready for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration, output_path, annotate=None):
+        """
+        Samples for duration seconds, then writes output_path.
+        annotate, if given, returns a list of labels prepended to each sampled stack
+        (e.g. the current chat and poll cycle). Returns False if already running.
+        """
+        if self.running:
+            return False
+        self.thread = threading.Thread(
+            target=self._run, args=(duration, output_path, annotate), name="sampling-profiler", daemon=True
+        )
+        self.thread.start()
+        return True
+
+    def _run(self, duration, output_path, annotate):
+        own_ident = threading.get_ident()
+        counts = collections.Counter()
+        deadline = time.monotonic() + duration
+
+        while time.monotonic() < deadline:
+            labels = annotate() if annotate else []
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack.reverse()
+                counts[";".join([*labels, thread_names.get(ident, str(ident)), *stack])] += 1
+            time.sleep(self.interval)
+
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "w") as output:
+            for stack, count in counts.most_common():
+                output.write(f"{stack} {count}\n")
@@ -0,0 +1,168 @@
+import json
+import struct
+import threading
+from multiprocessing import shared_memory
+
+# Header: capacity, write sequence, read sequence, dropped record count. Each word
+# has a single writer: the producer owns write_seq and dropped, the consumer read_seq
+HEADER_FORMAT = "<QQQQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+WORD_FORMAT = "<Q"
+WRITE_SEQ_OFFSET = 8
+READ_SEQ_OFFSET = 16
+DROPPED_OFFSET = 24
+
+# Record: kind, timestamp (ms), raw sender hash, chat id, thread parent ts, content length,
+# context length, then the UTF-8 content and the JSON-encoded context window
+RECORD_FORMAT = "<Bq32s32s24sII"
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_FORMAT)
+MAX_CHAT_ID_BYTES = 32
+MAX_THREAD_TS_BYTES = 24
+MAX_CONTENT_BYTES = 4096
+MAX_CONTEXT_BYTES = 8192
+SLOT_SIZE = RECORD_HEADER_SIZE + MAX_CONTENT_BYTES + MAX_CONTEXT_BYTES
+
+RECORD_NEW_MESSAGE = 1
+
+
+def _encode_context(context):
+    """
+    JSON-encodes a delta-encoded context window, dropping its oldest messages
+    until it fits in MAX_CONTEXT_BYTES.
+    """
+    if not context:
+        return b""
+
+    base_timestamp = context["base_timestamp"]
+    messages = list(context["messages"])
+    while messages:
+        encoded = json.dumps(
+            {**context, "base_timestamp": base_timestamp, "messages": messages}, separators=(",", ":")
+        ).encode("utf-8")
+        if len(encoded) <= MAX_CONTEXT_BYTES:
+            return encoded
+
+        # The next message becomes the first, so its delta moves into the base timestamp
+        messages.pop(0)
+        if messages:
+            base_timestamp += messages[0][0]
+            messages[0] = [0, *messages[0][1:]]
+    return b""
+
+
+def _encode_id(value, limit, field):
+    encoded = value.encode("ascii") if value else b""
+    if len(encoded) > limit:
+        raise ValueError(f"{field} '{value}' does not fit in {limit} bytes")
+    return encoded
+
+
+class SharedRingBuffer:
+    """
+    Single-producer, single-consumer ring of fixed-layout message records kept in
+    shared memory. No lock is shared between processes: each side only writes its
+    own header words, so a process killed mid-push or mid-pop cannot block the other.
+    The lock only serializes threads within one process.
+    """
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.lock = threading.Lock()
+        self.capacity = struct.unpack_from(HEADER_FORMAT, shm.buf, 0)[0]
+
+    @classmethod
+    def create(cls, capacity):
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * SLOT_SIZE)
+        struct.pack_into(HEADER_FORMAT, shm.buf, 0, capacity, 0, 0, 0)
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def _read_word(self, offset):
+        return struct.unpack_from(WORD_FORMAT, self.shm.buf, offset)[0]
+
+    def _write_word(self, offset, value):
+        struct.pack_into(WORD_FORMAT, self.shm.buf, offset, value)
+
+    def _slot_offset(self, seq):
+        return HEADER_SIZE + (seq % self.capacity) * SLOT_SIZE
+
+    def push(self, kind, timestamp, hashed_sender_name, content, context=None, chat_id=None, thread_ts=None):
+        """
+        Appends a record. Returns False (and counts a drop) if the ring is full.
+        Content longer than MAX_CONTENT_BYTES is truncated; a context window that
+        does not fit in MAX_CONTEXT_BYTES loses its oldest messages. Raises ValueError if the
+        chat id or thread ts does not fit, rather than sending a garbled one.
+        """
+        encoded_chat_id = _encode_id(chat_id, MAX_CHAT_ID_BYTES, "chat id")
+        encoded_thread_ts = _encode_id(thread_ts, MAX_THREAD_TS_BYTES, "thread ts")
+        encoded = content.encode("utf-8")[:MAX_CONTENT_BYTES]
+        encoded_context = _encode_context(context)
+        sender = bytes.fromhex(hashed_sender_name) if hashed_sender_name else b""
+
+        with self.lock:
+            write_seq = self._read_word(WRITE_SEQ_OFFSET)
+            if write_seq - self._read_word(READ_SEQ_OFFSET) >= self.capacity:
+                self._write_word(DROPPED_OFFSET, self._read_word(DROPPED_OFFSET) + 1)
+                return False
+
+            offset = self._slot_offset(write_seq)
+            struct.pack_into(
+                RECORD_FORMAT, self.shm.buf, offset,
+                kind, timestamp if timestamp is not None else -1, sender, encoded_chat_id, encoded_thread_ts,
+                len(encoded), len(encoded_context),
+            )
+            content_offset = offset + RECORD_HEADER_SIZE
+            context_offset = content_offset + MAX_CONTENT_BYTES
+            self.shm.buf[content_offset:content_offset + len(encoded)] = encoded
+            self.shm.buf[context_offset:context_offset + len(encoded_context)] = encoded_context
+
+            # Publish the slot only once it is fully written
+            self._write_word(WRITE_SEQ_OFFSET, write_seq + 1)
+        return True
+
+    def pop(self):
+        """
+        Removes and returns the oldest record as a dict, or None if the ring is empty.
+        """
+        with self.lock:
+            read_seq = self._read_word(READ_SEQ_OFFSET)
+            if read_seq >= self._read_word(WRITE_SEQ_OFFSET):
+                return None
+
+            offset = self._slot_offset(read_seq)
+            kind, timestamp, sender, chat_id, thread_ts, length, context_length = struct.unpack_from(
+                RECORD_FORMAT, self.shm.buf, offset
+            )
+            content_offset = offset + RECORD_HEADER_SIZE
+            context_offset = content_offset + MAX_CONTENT_BYTES
+            content = bytes(self.shm.buf[content_offset:content_offset + length])
+            context = bytes(self.shm.buf[context_offset:context_offset + context_length])
+
+            # Hand the slot back to the producer only once it is copied out
+            self._write_word(READ_SEQ_OFFSET, read_seq + 1)
+
+        return {
+            "kind": kind,
+            "timestamp": timestamp if timestamp >= 0 else None,
+            "hashed_sender_name": sender.hex() if sender.strip(b"\0") else None,
+            "chat_id": chat_id.rstrip(b"\0").decode("ascii") or None,
+            "thread_ts": thread_ts.rstrip(b"\0").decode("ascii") or None,
+            "content": content.decode("utf-8", errors="ignore"),
+            "context": json.loads(context) if context else None,
+        }
+
+    def dropped(self):
+        return self._read_word(DROPPED_OFFSET)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
@@ -0,0 +1,230 @@
+"""
+Hosts many tenants' messaging clients in one process.
+
+Each tenant gets its own copy of the messaging_slack module, loaded under a
+tenant-specific name with the tenant's settings in the environment, so its
+driver, Socket.IO client and state are isolated from every other tenant's.
+Tenants are assigned to nodes with a consistent-hash ring; a static JSON
+config stands in for a coordinator:
+
+    python tenant_host.py --config tenants.json --node node-a
+
+See tenants.example.json for the config layout.
+"""
+import argparse
+import bisect
+import contextlib
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+
+from client_logging import setup_logging, toggle_hot_path_logging
+from sampling_profiler import SamplingProfiler
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+CLIENT_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "messaging_slack.py")
+VIRTUAL_NODES = 64  # Points per node on the hash ring
+DEFAULT_POLL_CPU_SHARE = 0.25  # Fraction of one core a tenant's poll thread may use
+DEFAULT_MAX_TRACKED_CHATS = 50  # Chats whose context, digest and thread state a tenant keeps
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")  # Where SIGUSR1 profiles of the whole host are written
+PROFILE_DURATION = float(os.getenv("PROFILE_DURATION", "30"))  # Seconds sampled per SIGUSR1
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))  # Seconds between stack samples
+
+# Tenant config keys and the environment variables the client module reads them from
+TENANT_SETTINGS = {
+    "user_id": "USER_ID",
+    "pepper": "PEPPER",
+    "self_name": "SELF_NAME",
+    "self_member_ids": "SELF_MEMBER_IDS",
+    "chrome_debugger_address": "CHROME_DEBUGGER_ADDRESS",
+    "websocket_server_url": "WEBSOCKET_SERVER_URL",
+    "state_file": "STATE_FILE",
+}
+
+# Module loads read os.environ, so only one may run at a time
+_load_lock = threading.Lock()
+
+
+def _ring_hash(key):
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent-hash ring mapping tenant ids to nodes."""
+
+    def __init__(self, nodes, virtual_nodes=VIRTUAL_NODES):
+        self.points = sorted(
+            (_ring_hash(f"{node}#{i}"), node) for node in nodes for i in range(virtual_nodes)
+        )
+        self.hashes = [point for point, _ in self.points]
+
+    def node_for(self, tenant_id):
+        index = bisect.bisect(self.hashes, _ring_hash(tenant_id)) % len(self.points)
+        return self.points[index][1]
+
+
+class StaticCoordinator:
+    """Stand-in for a coordinator service: reads nodes and tenants from a JSON file."""
+
+    def __init__(self, config_path):
+        with open(config_path) as config_file:
+            config = json.load(config_file)
+        self.nodes = config["nodes"]
+        self.tenants = {tenant["tenant_id"]: tenant for tenant in config["tenants"]}
+        self.ring = HashRing(self.nodes)
+
+    def tenants_for(self, node):
+        if node not in self.nodes:
+            raise ValueError(f"Unknown node '{node}'; expected one of {self.nodes}")
+        return [tenant for tenant_id, tenant in self.tenants.items() if self.ring.node_for(tenant_id) == node]
+
+
+class TenantLimits:
+    """
+    Applies a tenant's limits once per poll cycle: throttles its poll thread to
+    poll_cpu_share of a core, and keeps per-chat state for at most
+    max_tracked_chats chats. Only the poll thread's own CPU time is counted,
+    not the browser's, and the chat limit bounds state rather than measuring memory.
+    """
+
+    def __init__(self, client, poll_cpu_share=DEFAULT_POLL_CPU_SHARE, max_tracked_chats=DEFAULT_MAX_TRACKED_CHATS):
+        self.client = client
+        self.poll_cpu_share = poll_cpu_share
+        self.max_tracked_chats = max_tracked_chats
+        self.last_cpu = None
+        self.last_wall = None
+
+    def on_cycle(self):
+        cpu, wall = time.thread_time(), time.monotonic()
+        if self.last_cpu is not None:
+            used, elapsed = cpu - self.last_cpu, wall - self.last_wall
+            if used > self.poll_cpu_share * elapsed:
+                time.sleep(used / self.poll_cpu_share - elapsed)
+
+        for state in (self.client.chat_context, self.client.message_digest_index, self.client.thread_cursors):
+            # Dicts keep insertion order, so the first keys are the longest-tracked chats
+            for chat_id in list(state)[:max(0, len(state) - self.max_tracked_chats)]:
+                if chat_id != self.client.monitored_chat_id:
+                    del state[chat_id]
+
+        self.last_cpu, self.last_wall = time.thread_time(), time.monotonic()
+
+
+@contextlib.contextmanager
+def tenant_environment(tenant):
+    saved = {}
+    for key, env_var in TENANT_SETTINGS.items():
+        if key in tenant:
+            saved[env_var] = os.environ.get(env_var)
+            os.environ[env_var] = str(tenant[key])
+    try:
+        yield
+    finally:
+        for env_var, value in saved.items():
+            if value is None:
+                os.environ.pop(env_var, None)
+            else:
+                os.environ[env_var] = value
+
+
+def load_tenant_client(tenant):
+    """Loads a private copy of the client module configured for this tenant."""
+    # Tenants must not share a state file
+    tenant = {"state_file": f"client_state-{tenant['tenant_id']}.json", **tenant}
+    with _load_lock, tenant_environment(tenant):
+        spec = importlib.util.spec_from_file_location(f"messaging_slack_{tenant['tenant_id']}", CLIENT_MODULE_PATH)
+        client = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(client)
+    return client
+
+
+def run_tenant(tenant_id, client, limits):
+    try:
+        client.connect_to_server()
+        client.attach_driver()
+        # Non-interactive stand-in for collect_workspaces(): publish the sidebar once
+        client.emit_workspace_update()
+        threading.Thread(target=client.watchdog_loop, name=f"{tenant_id}-watchdog", daemon=True).start()
+        client.poll_loop(on_cycle=limits.on_cycle)
+    except Exception:
+        logger.exception(f"Tenant '{tenant_id}' stopped.")
+
+
+def stop_tenant(client):
+    client.running = False
+    try:
+        client.sio.disconnect()
+    except Exception:
+        pass
+    try:
+        client.driver.quit()
+    except Exception:
+        pass
+
+
+def host(config_path, node):
+    coordinator = StaticCoordinator(config_path)
+    tenants = coordinator.tenants_for(node)
+    logger.info(f"Node '{node}' hosts {len(tenants)} of {len(coordinator.tenants)} tenant(s).")
+
+    clients = {}
+    for tenant in tenants:
+        client = load_tenant_client(tenant)
+        limits = TenantLimits(
+            client,
+            poll_cpu_share=tenant.get("poll_cpu_share", DEFAULT_POLL_CPU_SHARE),
+            max_tracked_chats=tenant.get("max_tracked_chats", DEFAULT_MAX_TRACKED_CHATS),
+        )
+        clients[tenant["tenant_id"]] = client
+        threading.Thread(
+            target=run_tenant, args=(tenant["tenant_id"], client, limits), name=tenant["tenant_id"], daemon=True
+        ).start()
+
+    # Each client module installs its own handlers on load, so only the last tenant's would run;
+    # the host's replace them all and act for every tenant
+    def shutdown(sig, frame):
+        logger.info("Shutting down tenant host...")
+        for client in clients.values():
+            stop_tenant(client)
+        sys.exit(0)
+
+    # One profile covers every tenant: samples include the thread name, and poll threads are named by tenant
+    profiler = SamplingProfiler(interval=PROFILE_SAMPLE_INTERVAL)
+
+    def start_profiling(sig, frame):
+        output_path = os.path.join(PROFILE_DIR, f"profile-{int(time.time())}-{os.getpid()}.collapsed")
+        if profiler.start(PROFILE_DURATION, output_path):
+            logger.info("Profiling for %ss; collapsed stacks will be written to %s", PROFILE_DURATION, output_path)
+        else:
+            logger.warning("A profile is already being recorded.")
+
+    # The hot-path logger is shared by all tenants, so one toggle covers them
+    def toggle_hot_path(sig, frame):
+        enabled = toggle_hot_path_logging()
+        logger.info("Hot-path logging %s", "enabled" if enabled else "disabled")
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    # SIGUSR1 and SIGUSR2 do not exist on Windows
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, start_profiling)
+        signal.signal(signal.SIGUSR2, toggle_hot_path)
+
+    while True:
+        time.sleep(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", required=True, help="JSON file listing nodes and tenants")
+    parser.add_argument("--node", required=True, help="This node's name in the config")
+    args = parser.parse_args()
+    host(args.config, args.node)
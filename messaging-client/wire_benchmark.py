@@ -0,0 +1,75 @@
+"""
+Compares JSON against the msgpack wire format on recorded traffic.
+
+Record traffic by running the client with RECORD_TRAFFIC_FILE=traffic.jsonl, then:
+
+    python wire_benchmark.py traffic.jsonl
+"""
+import json
+import sys
+import time
+
+from wire_format import WireDecoder, WireEncoder, msgpack
+
+
+def load_traffic(path):
+    with open(path) as traffic_file:
+        return [json.loads(line) for line in traffic_file if line.strip()]
+
+
+def encode_json(events):
+    # What python-socketio puts on the wire for a text event
+    return [json.dumps([entry["event"], entry["data"]], separators=(",", ":")).encode("utf-8") for entry in events]
+
+
+def encode_msgpack(events, compression):
+    encoder = WireEncoder(compression=compression)
+    return [encoder.encode(entry["event"], entry["data"]) for entry in events]
+
+
+def check_round_trip(events, frames):
+    decoder = WireDecoder()
+    for entry, frame in zip(events, frames):
+        event, payload = decoder.decode(frame)
+        if event != entry["event"] or payload != entry["data"]:
+            raise AssertionError(f"Round trip mismatch for '{entry['event']}' event")
+
+
+def measure(name, encode, events, repeats=5):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        frames = encode()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    total = sum(len(frame) for frame in frames)
+    return name, total, total / len(events), len(events) / best, frames
+
+
+def main(path):
+    if msgpack is None:
+        sys.exit("msgpack is not installed.")
+
+    events = load_traffic(path)
+    if not events:
+        sys.exit("No events recorded.")
+
+    results = [
+        measure("json", lambda: encode_json(events), events),
+        measure("msgpack", lambda: encode_msgpack(events, False), events),
+        measure("msgpack+zlib", lambda: encode_msgpack(events, True), events),
+    ]
+    for _, _, _, _, frames in results[1:]:
+        check_round_trip(events, frames)
+
+    json_total = results[0][1]
+    print(f"{len(events)} events from {path}")
+    print(f"{'format':<14}{'bytes':>12}{'bytes/event':>14}{'vs json':>10}{'events/s':>14}")
+    for name, total, per_event, throughput, _ in results:
+        print(f"{name:<14}{total:>12}{per_event:>14.1f}{total / json_total:>10.2f}{throughput:>14.0f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    main(sys.argv[1])
@@ -0,0 +1,147 @@
+"""
+Compact binary encoding for client-to-backend events.
+
+Frames are a flags byte followed by a MessagePack map {"e": event, "p": payload,
+"d": definitions}, zlib-compressed when large. Sender hashes, user ids and
+workspace chat entries are interned per connection: the first frame that uses
+a value carries its definition in "d", later frames send only the integer
+reference. Both ends must start from empty tables on every new connection.
+"""
+import zlib
+
+try:
+    import msgpack
+except ImportError:  # Optional; the client stays on JSON without it
+    msgpack = None
+
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_MSGPACK = "msgpack"
+
+# Event carrying a packed frame; the backend unpacks it and dispatches the inner event
+PACKED_EVENT = "packedEvent"
+
+FLAG_COMPRESSED = 0x01
+COMPRESSION_THRESHOLD = 1024  # Bytes; smaller frames are sent uncompressed
+
+WORKSPACE_LISTS = ("channels", "privateChannels", "dms", "groupDms")
+
+
+class InternTable:
+    """Assigns stable integer references to values in first-seen order."""
+
+    def __init__(self):
+        self.refs = {}
+
+    def ref(self, value):
+        """Returns (ref, is_new)."""
+        ref = self.refs.get(value)
+        if ref is not None:
+            return ref, False
+        ref = self.refs[value] = len(self.refs)
+        return ref, True
+
+
+class WireEncoder:
+    """Packs events for one connection; not thread-safe, callers serialize encode()."""
+
+    def __init__(self, compression=True):
+        self.compression = compression
+        self.senders = InternTable()
+        self.users = InternTable()
+        self.chats = InternTable()
+
+    def encode(self, event, data):
+        definitions = {"s": [], "u": [], "c": []}
+        frame = {"e": event, "p": self._compact(data, definitions)}
+        if any(definitions.values()):
+            frame["d"] = definitions
+
+        body = msgpack.packb(frame, use_bin_type=True)
+        flags = 0
+        if self.compression and len(body) > COMPRESSION_THRESHOLD:
+            compressed = zlib.compress(body)
+            if len(compressed) < len(body):
+                body, flags = compressed, FLAG_COMPRESSED
+        return bytes([flags]) + body
+
+    def _sender_ref(self, hashed_sender_name, definitions):
+        ref, is_new = self.senders.ref(hashed_sender_name)
+        if is_new:
+            definitions["s"].append([ref, bytes.fromhex(hashed_sender_name)])
+        return ref
+
+    def _compact(self, data, definitions):
+        if not isinstance(data, dict):
+            return data
+
+        payload = dict(data)
+
+        if isinstance(payload.get("user_id"), str):
+            ref, is_new = self.users.ref(payload["user_id"])
+            if is_new:
+                definitions["u"].append([ref, payload["user_id"]])
+            payload["user_id"] = ref
+
+        if isinstance(payload.get("hashed_sender_name"), str):
+            payload["hashed_sender_name"] = self._sender_ref(payload["hashed_sender_name"], definitions)
+
+        context = payload.get("context")
+        if isinstance(context, dict) and context.get("senders"):
+            payload["context"] = dict(context)
+            payload["context"]["senders"] = [
+                self._sender_ref(sender, definitions) for sender in context["senders"]
+            ]
+
+        for key in WORKSPACE_LISTS:
+            if isinstance(payload.get(key), list):
+                refs = []
+                for chat in payload[key]:
+                    entry = (chat.get("id"), chat.get("name"), chat.get("type"))
+                    ref, is_new = self.chats.ref(entry)
+                    if is_new:
+                        definitions["c"].append([ref, *entry])
+                    refs.append(ref)
+                payload[key] = refs
+
+        return payload
+
+
+class WireDecoder:
+    """Unpacks frames produced by WireEncoder; mirrors the backend's decoder."""
+
+    def __init__(self):
+        self.senders = {}
+        self.users = {}
+        self.chats = {}
+
+    def decode(self, frame):
+        body = frame[1:]
+        if frame[0] & FLAG_COMPRESSED:
+            body = zlib.decompress(body)
+        unpacked = msgpack.unpackb(body, raw=False)
+
+        definitions = unpacked.get("d", {})
+        for ref, raw in definitions.get("s", []):
+            self.senders[ref] = raw.hex()
+        for ref, user_id in definitions.get("u", []):
+            self.users[ref] = user_id
+        for ref, chat_id, name, chat_type in definitions.get("c", []):
+            self.chats[ref] = {"id": chat_id, "name": name, "type": chat_type}
+
+        return unpacked["e"], self._expand(unpacked["p"])
+
+    def _expand(self, payload):
+        if not isinstance(payload, dict):
+            return payload
+
+        if isinstance(payload.get("user_id"), int):
+            payload["user_id"] = self.users[payload["user_id"]]
+        if isinstance(payload.get("hashed_sender_name"), int):
+            payload["hashed_sender_name"] = self.senders[payload["hashed_sender_name"]]
+        context = payload.get("context")
+        if isinstance(context, dict) and context.get("senders"):
+            context["senders"] = [self.senders[ref] for ref in context["senders"]]
+        for key in WORKSPACE_LISTS:
+            if isinstance(payload.get(key), list):
+                payload[key] = [dict(self.chats[ref]) for ref in payload[key]]
+        return payload